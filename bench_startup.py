@@ -0,0 +1,140 @@
+"""Startup benchmark for the Flet app.
+
+    python bench_startup.py [--rows 200000] [--store memory|sql|auto] [--runs 5] [--cold]
+
+Each run starts a fresh interpreter (cold imports) and drives main.main()
+against a headless stand-in for ft.Page, reporting:
+
+- import: time to import main (flet, cvss, storage, ...)
+- first_frame: main() entry until the first page.update() with the tabs added
+- ready: main() entry until the store is loaded and the UI hydrated
+
+The database is generated once per row count with a fixed seed, so numbers
+are comparable between runs and commits. The memory store writes a snapshot
+next to the database on its first load, so later runs are warm starts;
+--cold deletes the snapshot before every run.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SEED = 1337
+
+def _bench_db(rows: int) -> str:
+    path = os.path.join(tempfile.gettempdir(), f"riskmapper_bench_{rows}.db")
+    if os.path.exists(path):
+        return path
+
+    sys.path.insert(0, HERE)
+    import db
+    import importer
+    from cvss import METRIC_FIELDS, METRIC_VALUES
+    from storage import SqlStore
+
+    rng = random.Random(SEED)
+    db.DB_PATH = path + ".tmp"
+    store = SqlStore()
+    store.load_from_db()
+    chunk = []
+    for i in range(rows):
+        row = {"asset": f"host-{rng.randrange(max(1, rows // 40))}", "title": f"Finding {rng.randrange(1000)}"}
+        row.update({k: rng.choice(METRIC_VALUES[k]) for k in METRIC_FIELDS})
+        chunk.append(row)
+        if len(chunk) == 5000:
+            importer.import_chunks(store, [chunk])
+            chunk = []
+    if chunk:
+        importer.import_chunks(store, [chunk])
+    db.close_all()
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(db.DB_PATH + suffix):
+            os.remove(db.DB_PATH + suffix)
+    os.replace(db.DB_PATH, path)
+    return path
+
+class _Window:
+    width = 0
+    height = 0
+
+class _HeadlessPage:
+    """Just enough of ft.Page for main() to run without a Flet client."""
+
+    def __init__(self, started: float) -> None:
+        self.window = _Window()
+        self.overlay = []
+        self.controls = []
+        self.started = started
+        self.first_frame = None
+        self.threads = []
+
+    def add(self, *controls) -> None:
+        self.controls.extend(controls)
+        self.update()
+
+    def update(self, *controls) -> None:
+        if self.first_frame is None and self.controls:
+            self.first_frame = time.perf_counter() - self.started
+
+    def run_thread(self, fn, *args, **kwargs) -> None:
+        t = threading.Thread(target=fn, args=args, kwargs=kwargs, daemon=True)
+        self.threads.append(t)
+        t.start()
+
+    def set_clipboard(self, text: str) -> None:
+        pass
+
+def _child(db_path: str) -> None:
+    t0 = time.perf_counter()
+    import main as app
+    import db
+    imported = time.perf_counter() - t0
+
+    db.DB_PATH = db_path
+    started = time.perf_counter()
+    page = _HeadlessPage(started)
+    app.main(page)
+    for t in page.threads:
+        t.join()
+    ready = time.perf_counter() - started
+    print(json.dumps({"import": imported, "first_frame": page.first_frame, "ready": ready}))
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--store", default="auto", choices=["memory", "sql", "auto"])
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--cold", action="store_true", help="delete the snapshot before each run")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        _child(args.child)
+        return
+
+    path = _bench_db(args.rows)
+    env = dict(os.environ, RISKMAPPER_STORE=args.store)
+    results = []
+    for _ in range(args.runs):
+        if args.cold and os.path.exists(path + ".snapshot"):
+            os.remove(path + ".snapshot")
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", path],
+            cwd=HERE, env=env, capture_output=True, text=True, check=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"rows={args.rows} store={args.store} runs={args.runs} cold={args.cold} db={path}")
+    for key in ("import", "first_frame", "ready"):
+        values = [r[key] for r in results]
+        print(f"{key:12} median {statistics.median(values) * 1000:8.1f} ms   min {min(values) * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
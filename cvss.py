@@ -1,6 +1,14 @@
+import functools
 import math
+import operator
+from array import array
 from dataclasses import dataclass
-from typing import Dict
+from typing import Any, Dict, List, Mapping, Sequence, Tuple, Union
+
+# NumPy is optional and only needed for columnar batches, so it is imported
+# on first use (see _load_numpy()) rather than with this module.
+np: Any = None
+_numpy_checked = False
 
 AV = {"N": 0.85, "A": 0.62, "L": 0.55, "P": 0.20}
 AC = {"L": 0.77, "H": 0.44}
@@ -22,6 +30,23 @@ ALLOWED = {
     "A": {"H", "L", "N"},
 }
 
+# Ordered values per metric: the position of a value is its digit in the
+# packed metric code (mixed radix, AV most significant, A least significant).
+METRIC_VALUES: Dict[str, Tuple[str, ...]] = {
+    "AV": ("N", "A", "L", "P"),
+    "AC": ("L", "H"),
+    "PR": ("N", "L", "H"),
+    "UI": ("N", "R"),
+    "S": ("U", "C"),
+    "C": ("H", "L", "N"),
+    "I": ("H", "L", "N"),
+    "A": ("H", "L", "N"),
+}
+
+VECTOR_COUNT = math.prod(len(METRIC_VALUES[k]) for k in METRIC_FIELDS)  # 2592
+
+SEVERITIES = ("None", "Low", "Medium", "High", "Critical")
+
 @dataclass(frozen=True)
 class CvssResult:
     score: float
@@ -51,10 +76,23 @@ def validate_metrics(metrics: Dict[str, str]) -> None:
         if v not in ALLOWED[k]:
             raise ValueError(f"Invalid {k}: '{v}'. Allowed: {sorted(ALLOWED[k])}")
 
-def calculate_base_score(metrics: Dict[str, str]) -> CvssResult:
+def reference_base_score(metrics: Dict[str, str]) -> CvssResult:
+    """Straight implementation of the CVSS v3.1 base formula.
+
+    Only used to build (and check) the precomputed table; callers should use
+    calculate_base_score().
+    """
     m = {k: (metrics[k] or "").strip().upper() for k in METRIC_FIELDS}
     validate_metrics(m)
+    score, impact, exploitability = _base_formula(m)
+    return CvssResult(
+        score=score,
+        severity=severity(score),
+        impact=impact,
+        exploitability=exploitability,
+    )
 
+def _base_formula(m: Dict[str, str]) -> Tuple[float, float, float]:
     av = AV[m["AV"]]
     ac = AC[m["AC"]]
     ui = UI[m["UI"]]
@@ -82,24 +120,279 @@ def calculate_base_score(metrics: Dict[str, str]) -> CvssResult:
         else:
             score = min(1.08 * (impact + exploitability), 10.0)
 
-    score = round_up_1_decimal(score)
-    impact = round_up_1_decimal(max(impact, 0.0))
-    exploitability = round_up_1_decimal(exploitability)
+    return (
+        round_up_1_decimal(score),
+        round_up_1_decimal(max(impact, 0.0)),
+        round_up_1_decimal(exploitability),
+    )
 
-    return CvssResult(
-        score=score,
-        severity=severity(score),
-        impact=impact,
-        exploitability=exploitability,
+def decode_metrics(code: int) -> Dict[str, str]:
+    if not 0 <= code < VECTOR_COUNT:
+        raise ValueError(f"Invalid metric code: {code}")
+    return dict(zip(METRIC_FIELDS, _KEYS[code]))
+
+def _build_table():
+    keys: List[Tuple[str, ...]] = [()]
+    for k in METRIC_FIELDS:
+        keys = [prefix + (v,) for prefix in keys for v in METRIC_VALUES[k]]
+
+    score10 = array("B")
+    impact10 = array("B")
+    exploit10 = array("B")
+    sev = bytearray()
+    for key in keys:
+        score, impact, exploitability = _base_formula(dict(zip(METRIC_FIELDS, key)))
+        score10.append(round(score * 10))
+        impact10.append(round(impact * 10))
+        exploit10.append(round(exploitability * 10))
+        sev.append(SEVERITIES.index(severity(score)))
+    return keys, score10, impact10, exploit10, bytes(sev)
+
+# Compact table indexed by metric code: scores are stored in tenths (0..100).
+_KEYS, SCORE10, IMPACT10, EXPLOIT10, SEVERITY_INDEX = _build_table()
+_CODE_BY_KEY: Dict[Tuple[str, ...], int] = {key: code for code, key in enumerate(_KEYS)}
+_RESULTS: Tuple[CvssResult, ...] = tuple(
+    CvssResult(
+        score=SCORE10[code] / 10.0,
+        severity=SEVERITIES[SEVERITY_INDEX[code]],
+        impact=IMPACT10[code] / 10.0,
+        exploitability=EXPLOIT10[code] / 10.0,
     )
-    
-    
-def vector_string(metrics: Dict[str, str]) -> str:
+    for code in range(VECTOR_COUNT)
+)
+_VECTORS: Tuple[str, ...] = tuple(
+    "CVSS:3.1/" + "/".join(f"{k}:{v}" for k, v in zip(METRIC_FIELDS, key)) for key in _KEYS
+)
+
+_CODE_BY_VECTOR: Dict[str, int] = {vec: code for code, vec in enumerate(_VECTORS)}
+
+VECTOR_PREFIX = "CVSS:3.1/"
+
+def metric_key(code: int) -> Tuple[str, ...]:
+    """Canonical (AV, AC, PR, UI, S, C, I, A) tuple for a metric code.
+
+    The tuples are shared, so equal vectors always yield the same object.
+    """
+    return _KEYS[code]
+
+def code_for_key(key: Tuple[str, ...]) -> int:
+    """Inverse of metric_key(); also accepts lists and non-canonical case."""
+    code = _CODE_BY_KEY.get(tuple(key))
+    if code is None:
+        code = metrics_code(dict(zip(METRIC_FIELDS, key)))
+    return code
+
+@functools.lru_cache(maxsize=4096)
+def _parse_vector_slow(vector: str) -> int:
+    if not vector.startswith(VECTOR_PREFIX):
+        raise ValueError(f"Not a CVSS v3.1 vector: '{vector}'")
+
+    seen: Dict[str, str] = {}
+    for part in vector[len(VECTOR_PREFIX):].split("/"):
+        k, sep, v = part.partition(":")
+        if not sep or k not in ALLOWED:
+            raise ValueError(f"Unknown base metric: '{part}'")
+        if k in seen:
+            raise ValueError(f"Duplicate metric: {k}")
+        if v not in ALLOWED[k]:
+            raise ValueError(f"Invalid {k}: '{v}'. Allowed: {sorted(ALLOWED[k])}")
+        seen[k] = v
+
+    for k in METRIC_FIELDS:
+        if k not in seen:
+            raise ValueError(f"Missing metric: {k}")
+    return _CODE_BY_KEY[tuple(seen[k] for k in METRIC_FIELDS)]
+
+def parse_vector(vector: str) -> int:
+    """Parse a `CVSS:3.1/AV:N/AC:L/...` base vector into its metric code.
+
+    Canonical vectors resolve with a single dict lookup; other spellings
+    (metrics in a different order, surrounding whitespace) are parsed strictly
+    and memoized.
+    """
+    code = _CODE_BY_VECTOR.get(vector)
+    if code is None:
+        code = _parse_vector_slow(vector.strip())
+    return code
+
+def metrics_from_vector(vector: str) -> Dict[str, str]:
+    return decode_metrics(parse_vector(vector))
+
+def metrics_code(metrics: Dict[str, str]) -> int:
+    try:
+        return _CODE_BY_KEY[(
+            metrics["AV"], metrics["AC"], metrics["PR"], metrics["UI"],
+            metrics["S"], metrics["C"], metrics["I"], metrics["A"],
+        )]
+    except (KeyError, TypeError):
+        pass
 
     m = {k: (metrics[k] or "").strip().upper() for k in METRIC_FIELDS}
     validate_metrics(m)
-    parts = ["CVSS:3.1"]
-    for k in ["AV", "AC", "PR", "UI", "S", "C", "I", "A"]:
-        parts.append(f"{k}:{m[k]}")
-    return "/".join(parts)
+    return _CODE_BY_KEY[tuple(m[k] for k in METRIC_FIELDS)]
+
+def result_for_code(code: int) -> CvssResult:
+    return _RESULTS[code]
+
+def vector_for_code(code: int) -> str:
+    return _VECTORS[code]
+
+def calculate_base_score(metrics: Dict[str, str]) -> CvssResult:
+    return _RESULTS[metrics_code(metrics)]
+
+
+def vector_string(metrics: Dict[str, str]) -> str:
+    return _VECTORS[metrics_code(metrics)]
+
+def check_table() -> int:
+    """Compare every precomputed entry against the reference formula.
+
+    Returns the number of vectors checked, raises RuntimeError on the first
+    mismatch.
+    """
+    for code in range(VECTOR_COUNT):
+        metrics = decode_metrics(code)
+        if metrics_code(metrics) != code:
+            raise RuntimeError(f"Metric code round-trip failed for {code}")
+        expected = reference_base_score(metrics)
+        if calculate_base_score(metrics) != expected:
+            raise RuntimeError(f"Score table mismatch for {_VECTORS[code]}: expected {expected}")
+    return VECTOR_COUNT
+
+@dataclass
+class BatchScores:
+    """Column-form result of calculate_base_scores().
+
+    Columns are aligned with the input rows. Invalid rows get code -1, NaN
+    scores and an empty severity, and are listed in `invalid` as
+    (row index, error message).
+    """
+    codes: Any
+    score: Any
+    severity: Any
+    impact: Any
+    exploitability: Any
+    invalid: List[Tuple[int, str]]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+Rows = Union[Sequence[Mapping[str, Any]], Mapping[str, Sequence[Any]]]
+
+_METRIC_GETTER = operator.itemgetter(*METRIC_FIELDS)
+
+# Per-code result columns with a trailing sentinel so that code -1 (invalid)
+# indexes NaN / "" without a branch.
+_NAN = float("nan")
+_SCORE_COL = tuple(x / 10.0 for x in SCORE10) + (_NAN,)
+_IMPACT_COL = tuple(x / 10.0 for x in IMPACT10) + (_NAN,)
+_EXPLOIT_COL = tuple(x / 10.0 for x in EXPLOIT10) + (_NAN,)
+_SEVERITY_COL = tuple(SEVERITIES[x] for x in SEVERITY_INDEX) + ("",)
+
+def _row_values(rows: Rows) -> List[Tuple[Any, ...]]:
+    if isinstance(rows, Mapping):
+        n = len(next(iter(rows.values()), ()))
+        return list(zip(*[rows[k] if k in rows else [None] * n for k in METRIC_FIELDS]))
+    try:
+        return list(map(_METRIC_GETTER, rows))
+    except KeyError:
+        return [tuple(r.get(k) for k in METRIC_FIELDS) for r in rows]
+
+def _row_error(values: Sequence[Any]) -> str:
+    try:
+        validate_metrics({k: v for k, v in zip(METRIC_FIELDS, values) if v is not None})
+    except Exception as ex:
+        return str(ex)
+    return ""
+
+def _codes_numpy(rows: Mapping[str, Sequence[Any]]):
+    n = len(next(iter(rows.values()), ()))
+    cols = [rows[k] if k in rows else [None] * n for k in METRIC_FIELDS]
+
+    codes = np.zeros(len(cols[0]), dtype=np.int32)
+    for k, col in zip(METRIC_FIELDS, cols):
+        arr = np.asarray(col)
+        if arr.dtype.kind != "U":
+            arr = arr.astype(object).astype(str)
+        digits = np.full(arr.shape, -VECTOR_COUNT, dtype=np.int32)
+        for d, v in enumerate(METRIC_VALUES[k]):
+            digits[arr == v] = d
+        # Non-canonical spellings (" n", "l") are rare: normalize them per
+        # distinct value instead of per row.
+        odd = digits < 0
+        if odd.any():
+            allowed = {v: d for d, v in enumerate(METRIC_VALUES[k])}
+            uniq, inverse = np.unique(arr[odd], return_inverse=True)
+            lut = np.array([allowed.get(u.strip().upper(), -VECTOR_COUNT) for u in uniq.tolist()], dtype=np.int32)
+            digits[odd] = lut[inverse]
+        codes = codes * len(METRIC_VALUES[k]) + digits
+
+    bad = codes < 0
+    codes[bad] = -1
+    invalid = [(int(i), _row_error([c[i] for c in cols])) for i in np.flatnonzero(bad)]
+    return codes, bad, invalid
+
+def _scores_numpy(rows: Mapping[str, Sequence[Any]]) -> BatchScores:
+    codes, bad, invalid = _codes_numpy(rows)
+    safe = np.where(bad, 0, codes)
+    score = _SCORE10_NP[safe] / 10.0
+    impact = _IMPACT10_NP[safe] / 10.0
+    exploitability = _EXPLOIT10_NP[safe] / 10.0
+    severity_col = _SEVERITIES_NP[_SEVERITY_INDEX_NP[safe]]
+    for col in (score, impact, exploitability):
+        col[bad] = np.nan
+    severity_col[bad] = ""
+    return BatchScores(codes, score, severity_col, impact, exploitability, invalid)
+
+def _scores_python(rows: Rows) -> BatchScores:
+    values = _row_values(rows)
+    codes = list(map(_CODE_BY_KEY.get, values))
+    invalid: List[Tuple[int, str]] = []
+
+    if None in codes:
+        for idx, code in enumerate(codes):
+            if code is not None:
+                continue
+            try:
+                codes[idx] = metrics_code(dict(zip(METRIC_FIELDS, values[idx])))
+            except Exception:
+                invalid.append((idx, _row_error(values[idx])))
+                codes[idx] = -1
+
+    return BatchScores(
+        array("h", codes),
+        array("d", [_SCORE_COL[c] for c in codes]),
+        [_SEVERITY_COL[c] for c in codes],
+        array("d", [_IMPACT_COL[c] for c in codes]),
+        array("d", [_EXPLOIT_COL[c] for c in codes]),
+        invalid,
+    )
+
+def calculate_base_scores(rows: Rows, use_numpy: bool = True) -> BatchScores:
+    """Score many findings at once.
+
+    `rows` is either a sequence of metric dicts (as returned by the parser) or
+    a mapping of metric name -> column. Invalid rows are reported in
+    `BatchScores.invalid` instead of raising. Columnar input is scored with
+    NumPy when it is installed; row dicts go through the tuple lookup, which
+    is faster than converting them to arrays first.
+    """
+    if use_numpy and isinstance(rows, Mapping) and len(rows) and _load_numpy():
+        return _scores_numpy(rows)
+    return _scores_python(rows)
 
+def _load_numpy() -> bool:
+    global np, _numpy_checked, _SCORE10_NP, _IMPACT10_NP, _EXPLOIT10_NP, _SEVERITY_INDEX_NP, _SEVERITIES_NP
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+        except ImportError:  # optional: batch scoring falls back to array loops
+            return False
+        np = numpy
+        _SCORE10_NP = np.frombuffer(SCORE10, dtype=np.uint8)
+        _IMPACT10_NP = np.frombuffer(IMPACT10, dtype=np.uint8)
+        _EXPLOIT10_NP = np.frombuffer(EXPLOIT10, dtype=np.uint8)
+        _SEVERITY_INDEX_NP = np.frombuffer(SEVERITY_INDEX, dtype=np.uint8)
+        _SEVERITIES_NP = np.array(SEVERITIES, dtype=object)
+    return np is not None
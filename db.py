@@ -1,31 +1,147 @@
+import atexit
+import hashlib
+import re
 import sqlite3
-from typing import Dict, List, Optional, Tuple, Any
+import string
+import threading
+from contextlib import contextmanager
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Any
 
 DB_PATH = "riskmapper.db"
 
-def connect():
-    con = sqlite3.connect(DB_PATH)
+# Applied to every connection. WAL lets readers run alongside the writer and
+# synchronous=NORMAL is durable in WAL mode except on power loss.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-32000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA foreign_keys=ON",
+)
+STATEMENT_CACHE_SIZE = 256
+
+# One persistent connection per thread, keyed by thread id so close_all() can
+# reach every one of them at shutdown.
+_connections: Dict[int, Tuple[str, sqlite3.Connection]] = {}
+_lock = threading.Lock()
+_initialized: set = set()
+
+def _open(path: str) -> sqlite3.Connection:
+    con = sqlite3.connect(path, cached_statements=STATEMENT_CACHE_SIZE, check_same_thread=False)
     con.row_factory = sqlite3.Row
+    for pragma in PRAGMAS:
+        con.execute(pragma)
+    return con
+
+def connect() -> sqlite3.Connection:
+    """Return this thread's connection to DB_PATH, opening it on first use."""
+    ident = threading.get_ident()
+    entry = _connections.get(ident)
+    if entry is not None and entry[0] == DB_PATH:
+        return entry[1]
+
+    con = _open(DB_PATH)
+    with _lock:
+        old = _connections.pop(ident, None)
+        _connections[ident] = (DB_PATH, con)
+    if old is not None:
+        old[1].close()
     return con
 
-def init_db():
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
     con = connect()
-    cur = con.cursor()
+    changes = con.total_changes
+    try:
+        yield con
+        if con.total_changes != changes:
+            _bump_generation(con)
+        con.commit()
+    except BaseException:
+        con.rollback()
+        raise
+
+@contextmanager
+def schema_transaction(con: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Explicit BEGIN IMMEDIATE ... COMMIT that also covers DDL.
+
+    In its default mode sqlite3 only opens a transaction before DML, so
+    CREATE/ALTER/DROP would commit on their own and a failure halfway
+    through a migration would leave the schema half changed.
+    """
+    isolation = con.isolation_level
+    con.isolation_level = None
+    try:
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            yield con
+        except BaseException:
+            if con.in_transaction:
+                con.execute("ROLLBACK")
+            raise
+        con.execute("COMMIT")
+    finally:
+        con.isolation_level = isolation
+
+def close() -> None:
+    """Close the calling thread's connection."""
+    with _lock:
+        entry = _connections.pop(threading.get_ident(), None)
+    if entry is not None:
+        entry[1].close()
+
+def close_all() -> None:
+    """Close every pooled connection (app shutdown, page disconnect).
+
+    Only the calling thread's connection and those of finished threads are
+    closed here. Another live thread may be in the middle of using its own
+    (an import between chunk commits), so that one is only dropped from the
+    pool: the garbage collector closes it once the thread lets go of it, and
+    the thread's next connect() opens a fresh one.
+    """
+    me = threading.get_ident()
+    alive = {t.ident for t in threading.enumerate()}
+    with _lock:
+        entries = list(_connections.items())
+        _connections.clear()
+    for ident, (_, con) in entries:
+        if ident != me and ident in alive:
+            continue
+        try:
+            con.execute("PRAGMA optimize")
+            con.close()
+        except sqlite3.Error:
+            pass
+
+atexit.register(close_all)
 
+# Schema version stored in PRAGMA user_version. MIGRATIONS[v] upgrades a
+# database from version v to v + 1 inside the init_db() schema_transaction(),
+# so a failed migration rolls back completely and can be retried.
+SCHEMA_VERSION = 3
+
+def _table_exists(cur: sqlite3.Cursor, name: str) -> bool:
+    return cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)).fetchone() is not None
+
+def _create_tables(cur: sqlite3.Cursor) -> None:
     cur.execute("""
     CREATE TABLE IF NOT EXISTS assets (
-        id TEXT PRIMARY KEY,
-        name TEXT NOT NULL UNIQUE,
-        tags TEXT NOT NULL,
-        services TEXT NOT NULL,
+        pk INTEGER PRIMARY KEY,
+        id TEXT NOT NULL UNIQUE,
+        name TEXT NOT NULL COLLATE NOCASE UNIQUE,
+        tags TEXT NOT NULL DEFAULT '',
+        services TEXT NOT NULL DEFAULT '',
         created_at TEXT DEFAULT (datetime('now'))
     )
     """)
 
     cur.execute("""
     CREATE TABLE IF NOT EXISTS findings (
-        id TEXT PRIMARY KEY,
-        asset_name TEXT NOT NULL,
+        pk INTEGER PRIMARY KEY,
+        id TEXT NOT NULL UNIQUE,
+        asset_id INTEGER NOT NULL REFERENCES assets(pk) ON DELETE CASCADE,
         title TEXT NOT NULL,
         av TEXT NOT NULL,
         ac TEXT NOT NULL,
@@ -42,9 +158,315 @@ def init_db():
     )
     """)
 
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_findings_asset ON findings(asset_name)")
-    con.commit()
-    con.close()
+def _migrate_0_to_1(cur: sqlite3.Cursor) -> None:
+    """Text-keyed tables -> integer keys with findings.asset_id.
+
+    Asset names become unique case-insensitively (the oldest row wins) and
+    findings whose asset_name has no asset row get one, replacing the orphan
+    backfill the app used to do on every start.
+    """
+    legacy = _table_exists(cur, "assets")
+    if legacy:
+        for trigger in ("trg_findings_risk_insert", "trg_findings_risk_delete", "trg_findings_risk_update"):
+            cur.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        for index in ("idx_findings_asset", "idx_assets_name_nocase", "idx_findings_asset_score"):
+            cur.execute(f"DROP INDEX IF EXISTS {index}")
+        cur.execute("DROP TABLE IF EXISTS asset_risk_summary")
+        cur.execute("DROP TABLE IF EXISTS risk_totals")
+        cur.execute("ALTER TABLE assets RENAME TO assets_v0")
+    legacy_findings = _table_exists(cur, "findings")
+    if legacy_findings:
+        cur.execute("ALTER TABLE findings RENAME TO findings_v0")
+
+    _create_tables(cur)
+    if not legacy:
+        return
+
+    name = "COALESCE(NULLIF(TRIM(f.asset_name), ''), 'Unassigned')"
+    cur.execute("""
+    INSERT OR IGNORE INTO assets(pk, id, name, tags, services, created_at)
+    SELECT rowid, id, TRIM(name), tags, services, created_at FROM assets_v0 ORDER BY rowid
+    """)
+    cur.execute("DROP TABLE assets_v0")
+    if not legacy_findings:
+        return
+
+    cur.execute(f"""
+    INSERT OR IGNORE INTO assets(id, name, created_at)
+    SELECT lower(hex(randomblob(16))), {name}, MIN(f.created_at)
+    FROM findings_v0 f GROUP BY {name} COLLATE NOCASE ORDER BY MIN(f.rowid)
+    """)
+    cur.execute(f"""
+    INSERT INTO findings(pk, id, asset_id, title, av, ac, pr, ui, s, c, i, a, score, severity, vector, created_at)
+    SELECT f.rowid, f.id, a.pk, f.title, f.av, f.ac, f.pr, f.ui, f.s, f.c, f.i, f.a,
+           f.score, f.severity, f.vector, f.created_at
+    FROM findings_v0 f JOIN assets a ON a.name = {name}
+    ORDER BY f.rowid
+    """)
+    cur.execute("DROP TABLE findings_v0")
+
+def _migrate_1_to_2(cur: sqlite3.Cursor) -> None:
+    """findings.content_key, unique: repeated imports no longer duplicate rows.
+
+    Existing duplicates (same asset, title and vector) collapse onto the
+    oldest row before the index is built.
+    """
+    cur.execute("ALTER TABLE findings ADD COLUMN content_key INTEGER")
+    _rebuild_content_keys(cur)
+
+def _migrate_2_to_3(cur: sqlite3.Cursor) -> None:
+    """Content keys fold asset names like COLLATE NOCASE (ASCII only).
+
+    Version 2 lower-cased them fully, so a finding of "ärger" could match
+    one stored under the distinct asset "Ärger".
+    """
+    _rebuild_content_keys(cur)
+
+def _rebuild_content_keys(cur: sqlite3.Cursor) -> None:
+    """Recompute content_key for every finding and (re)build its unique index.
+
+    Existing duplicates collapse onto the oldest row first.
+    """
+    cur.execute("DROP INDEX IF EXISTS idx_findings_content_key")
+    cur.connection.create_function(
+        "content_key", 10, lambda asset, title, *metrics: _content_key(asset, title, metrics), deterministic=True,
+    )
+    cur.execute("""
+    UPDATE findings SET content_key = content_key(
+        (SELECT name FROM assets WHERE pk = findings.asset_id), title, av, ac, pr, ui, s, c, i, a
+    )
+    """)
+    cur.execute("DELETE FROM findings WHERE pk NOT IN (SELECT MIN(pk) FROM findings GROUP BY content_key)")
+    cur.execute("CREATE UNIQUE INDEX idx_findings_content_key ON findings(content_key)")
+
+MIGRATIONS = {0: _migrate_0_to_1, 1: _migrate_1_to_2, 2: _migrate_2_to_3}
+
+def init_db(force: bool = False) -> None:
+    """Create or migrate the schema. Runs once per database path unless `force`."""
+    if DB_PATH in _initialized and not force:
+        return
+
+    con = connect()
+    # Table rebuilds must not trip or cascade foreign keys; the pragma is a
+    # no-op inside a transaction, so toggle it around the migration.
+    con.execute("PRAGMA foreign_keys=OFF")
+    try:
+        with schema_transaction(con):
+            cur = con.cursor()
+            # Read under the write lock, so two processes can't both migrate.
+            version = cur.execute("PRAGMA user_version").fetchone()[0]
+            if version > SCHEMA_VERSION:
+                raise RuntimeError(f"{DB_PATH} has schema version {version}; this build supports up to {SCHEMA_VERSION}")
+            migrated = version < SCHEMA_VERSION
+            while version < SCHEMA_VERSION:
+                MIGRATIONS[version](cur)
+                version += 1
+            cur.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_findings_asset_score ON findings(asset_id, score DESC)")
+            # Score order for streamed exports and top_findings(), without a
+            # sort over every row.
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_findings_score ON findings(score DESC)")
+            # Age order (either direction) for latest_findings() and loads.
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_findings_created ON findings(created_at)")
+
+            have_summary = _table_exists(cur, "asset_risk_summary")
+            _create_risk_summary(cur)
+            if not have_summary:
+                _rebuild_risk_summary(cur)
+            _create_generation(cur)
+            if migrated:
+                _bump_generation(con)
+            _create_search_index(cur)
+
+            # A full scan of findings, so only after the schema changed.
+            bad = cur.execute("PRAGMA foreign_key_check").fetchone() if migrated else None
+            if bad is not None:
+                raise RuntimeError(f"Foreign key violation in {bad[0]} after migration")
+    finally:
+        con.execute("PRAGMA foreign_keys=ON")
+    _initialized.add(DB_PATH)
+
+# Risk aggregates kept current by triggers on `findings`: one row per asset
+# plus a single global row in risk_totals. Score sums are integer tenths so
+# repeated add/remove never drifts.
+_SEVERITY_COLUMNS = (("Critical", "critical"), ("High", "high"), ("Medium", "medium"), ("Low", "low"), ("None", "none"))
+_COUNTER_DDL = "".join(f",\n            {col} INTEGER NOT NULL DEFAULT 0" for _, col in _SEVERITY_COLUMNS)
+
+def _risk_add_sql(row: str) -> str:
+    sevs = ", ".join(f"{row}.severity='{sev}'" for sev, _ in _SEVERITY_COLUMNS)
+    cols = ", ".join(col for _, col in _SEVERITY_COLUMNS)
+    bumps = ", ".join(f"{col}={col}+excluded.{col}" for _, col in _SEVERITY_COLUMNS)
+    totals = ", ".join(f"{col}={col}+({row}.severity='{sev}')" for sev, col in _SEVERITY_COLUMNS)
+    return f"""
+        INSERT INTO asset_risk_summary(asset_id, n, total10, max_score, {cols})
+        VALUES({row}.asset_id, 1, CAST(ROUND({row}.score*10) AS INTEGER), {row}.score, {sevs})
+        ON CONFLICT(asset_id) DO UPDATE SET
+            n=n+1, total10=total10+excluded.total10, max_score=MAX(max_score, excluded.max_score), {bumps};
+        UPDATE risk_totals SET n=n+1, total10=total10+CAST(ROUND({row}.score*10) AS INTEGER), {totals} WHERE id=1;
+    """
+
+def _risk_remove_sql(row: str) -> str:
+    drops = ", ".join(f"{col}={col}-({row}.severity='{sev}')" for sev, col in _SEVERITY_COLUMNS)
+    return f"""
+        UPDATE asset_risk_summary SET
+            n=n-1, total10=total10-CAST(ROUND({row}.score*10) AS INTEGER), {drops},
+            max_score=CASE WHEN {row}.score < max_score THEN max_score ELSE COALESCE(
+                (SELECT MAX(score) FROM findings WHERE asset_id={row}.asset_id), 0) END
+        WHERE asset_id={row}.asset_id;
+        DELETE FROM asset_risk_summary WHERE asset_id={row}.asset_id AND n<=0;
+        UPDATE risk_totals SET n=n-1, total10=total10-CAST(ROUND({row}.score*10) AS INTEGER), {drops} WHERE id=1;
+    """
+
+def _create_risk_summary(cur: sqlite3.Cursor) -> None:
+    cur.execute(f"""
+    CREATE TABLE IF NOT EXISTS asset_risk_summary (
+        asset_id INTEGER PRIMARY KEY,
+        n INTEGER NOT NULL DEFAULT 0,
+        total10 INTEGER NOT NULL DEFAULT 0,
+        max_score REAL NOT NULL DEFAULT 0{_COUNTER_DDL}
+    )
+    """)
+    cur.execute(f"""
+    CREATE TABLE IF NOT EXISTS risk_totals (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        n INTEGER NOT NULL DEFAULT 0,
+        total10 INTEGER NOT NULL DEFAULT 0{_COUNTER_DDL}
+    )
+    """)
+    cur.execute("INSERT OR IGNORE INTO risk_totals(id) VALUES(1)")
+    cur.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_findings_risk_insert AFTER INSERT ON findings BEGIN
+        {_risk_add_sql("NEW")}
+    END
+    """)
+    cur.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_findings_risk_delete AFTER DELETE ON findings BEGIN
+        {_risk_remove_sql("OLD")}
+    END
+    """)
+    cur.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_findings_risk_update
+    AFTER UPDATE OF asset_id, score, severity ON findings BEGIN
+        {_risk_remove_sql("OLD")}
+        {_risk_add_sql("NEW")}
+    END
+    """)
+
+def _create_generation(cur: sqlite3.Cursor) -> None:
+    """Change counter for caches of the whole database (see snapshot.py).
+
+    Every write transaction in this module bumps `n` once (see
+    _bump_generation()), whichever process runs it; `uid` tells databases
+    apart when a file is replaced.
+    """
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS data_generation (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        n INTEGER NOT NULL DEFAULT 0,
+        uid TEXT NOT NULL
+    )
+    """)
+    cur.execute("INSERT OR IGNORE INTO data_generation(id, uid) VALUES(1, lower(hex(randomblob(16))))")
+    # Earlier builds bumped the counter from a trigger on every row.
+    for table in ("assets", "findings"):
+        for event in ("insert", "update", "delete"):
+            cur.execute(f"DROP TRIGGER IF EXISTS trg_{table}_generation_{event}")
+
+def _bump_generation(con: sqlite3.Connection) -> None:
+    """Mark the open write transaction as a change to the data."""
+    con.execute("UPDATE data_generation SET n = n + 1 WHERE id = 1")
+
+# Full-text index over finding titles and asset names, rowid = findings.pk,
+# kept current by triggers. Without FTS5 in the SQLite build the triggers
+# are dropped and search_findings() falls back to LIKE.
+_FTS_TRIGGERS = (
+    "trg_findings_fts_insert", "trg_findings_fts_delete", "trg_findings_fts_update", "trg_assets_fts_rename",
+)
+
+def _create_search_index(cur: sqlite3.Cursor) -> None:
+    have_triggers = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='trigger' AND name=?", (_FTS_TRIGGERS[0],)
+    ).fetchone() is not None
+    try:
+        cur.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS findings_fts USING fts5(
+            title, asset_name, tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        """)
+        cur.execute("SELECT 1 FROM findings_fts LIMIT 0")
+    except sqlite3.OperationalError:
+        for trigger in _FTS_TRIGGERS:
+            cur.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        return
+    if have_triggers:
+        return
+
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_findings_fts_insert AFTER INSERT ON findings BEGIN
+        INSERT INTO findings_fts(rowid, title, asset_name)
+        VALUES(NEW.pk, NEW.title, (SELECT name FROM assets WHERE pk = NEW.asset_id));
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_findings_fts_delete AFTER DELETE ON findings BEGIN
+        DELETE FROM findings_fts WHERE rowid = OLD.pk;
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_findings_fts_update AFTER UPDATE OF title, asset_id ON findings BEGIN
+        UPDATE findings_fts SET title = NEW.title, asset_name = (SELECT name FROM assets WHERE pk = NEW.asset_id)
+        WHERE rowid = NEW.pk;
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_assets_fts_rename AFTER UPDATE OF name ON assets BEGIN
+        UPDATE findings_fts SET asset_name = NEW.name WHERE rowid IN (SELECT pk FROM findings WHERE asset_id = NEW.pk);
+    END
+    """)
+    # Title matches count twice as much as asset name matches.
+    cur.execute("INSERT INTO findings_fts(findings_fts, rank) VALUES('rank', 'bm25(2.0, 1.0)')")
+    # New index, or triggers that were off while FTS5 was unavailable.
+    _rebuild_search_index(cur)
+
+def _rebuild_search_index(cur: sqlite3.Cursor) -> None:
+    cur.execute("DELETE FROM findings_fts")
+    cur.execute("""
+    INSERT INTO findings_fts(rowid, title, asset_name)
+    SELECT f.pk, f.title, a.name FROM findings f JOIN assets a ON a.pk = f.asset_id
+    """)
+
+def rebuild_search_index() -> None:
+    """Repopulate findings_fts from the findings table."""
+    init_db()
+    with transaction() as con:
+        cur = con.cursor()
+        if _table_exists(cur, "findings_fts"):
+            _rebuild_search_index(cur)
+
+def data_generation() -> Tuple[str, int]:
+    """(uid, n) of the database; n changes whenever assets or findings do."""
+    r = connect().execute("SELECT uid, n FROM data_generation WHERE id=1").fetchone()
+    return r[0], r[1]
+
+def _rebuild_risk_summary(cur: sqlite3.Cursor) -> None:
+    cols = ", ".join(col for _, col in _SEVERITY_COLUMNS)
+    sums = ", ".join(f"COALESCE(SUM(severity='{sev}'), 0)" for sev, _ in _SEVERITY_COLUMNS)
+    tenths = "COALESCE(SUM(CAST(ROUND(score*10) AS INTEGER)), 0)"
+    cur.execute("DELETE FROM asset_risk_summary")
+    cur.execute(f"""
+    INSERT INTO asset_risk_summary(asset_id, n, total10, max_score, {cols})
+    SELECT asset_id, COUNT(*), {tenths}, MAX(score), {sums}
+    FROM findings GROUP BY asset_id
+    """)
+    cur.execute("DELETE FROM risk_totals")
+    cur.execute(f"INSERT INTO risk_totals(id, n, total10, {cols}) SELECT 1, COUNT(*), {tenths}, {sums} FROM findings")
+
+def rebuild_risk_summary() -> None:
+    """Recompute asset_risk_summary and risk_totals from the findings table."""
+    init_db()
+    with transaction() as con:
+        _rebuild_risk_summary(con.cursor())
 
 def _join_csv(items: List[str]) -> str:
     return ",".join([x.strip() for x in items if x.strip()])
@@ -56,41 +478,72 @@ def _split_csv(s: str) -> List[str]:
     return [x.strip() for x in s.split(",") if x.strip()]
 
 def upsert_asset(asset_id: str, name: str, tags: List[str], services: List[str]) -> None:
-    con = connect()
-    cur = con.cursor()
-    cur.execute("""
-    INSERT INTO assets(id, name, tags, services)
-    VALUES(?, ?, ?, ?)
-    ON CONFLICT(name) DO UPDATE SET
-        tags=excluded.tags,
-        services=excluded.services
-    """, (asset_id, name.strip(), _join_csv(tags), _join_csv(services)))
-    con.commit()
-    con.close()
+    with transaction() as con:
+        con.execute("""
+        INSERT INTO assets(id, name, tags, services)
+        VALUES(?, ?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET
+            tags=excluded.tags,
+            services=excluded.services
+        """, (asset_id, name.strip(), _join_csv(tags), _join_csv(services)))
 
 def delete_asset(asset_id: str) -> None:
-    con = connect()
-    cur = con.cursor()
-    cur.execute("DELETE FROM assets WHERE id=?", (asset_id,))
-    con.commit()
-    con.close()
+    with transaction() as con:
+        con.execute("DELETE FROM assets WHERE id=?", (asset_id,))
 
 def load_assets() -> List[Dict[str, Any]]:
-    con = connect()
-    cur = con.cursor()
-    rows = cur.execute("SELECT id,name,tags,services FROM assets ORDER BY created_at DESC").fetchall()
-    con.close()
-    return [
-        {
-            "id": r["id"],
-            "name": r["name"],
-            "tags": _split_csv(r["tags"]),
-            "services": _split_csv(r["services"]),
-        }
-        for r in rows
-    ]
+    # Oldest first, so a Store's dicts end up in creation order.
+    rows = connect().execute("SELECT id,name,tags,services FROM assets ORDER BY created_at, pk").fetchall()
+    return [_asset_dict(r) for r in rows]
 
-def insert_finding(
+def _asset_dict(r: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        "id": r["id"],
+        "name": r["name"],
+        "tags": _split_csv(r["tags"]),
+        "services": _split_csv(r["services"]),
+    }
+
+# Finding tuples (see finding_row()) carry the asset name; inserts resolve it
+# to assets.pk, so the asset must exist first.
+FINDING_COLUMNS = "id, asset_name, title, av, ac, pr, ui, s, c, i, a, score, severity, vector, content_key"
+_INSERT_FINDING = """
+INSERT INTO findings(id, asset_id, title, av, ac, pr, ui, s, c, i, a, score, severity, vector, content_key)
+VALUES(?, (SELECT pk FROM assets WHERE name=?), ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SELECT_FINDINGS = """
+SELECT f.id, a.name AS asset_name, f.title, f.av, f.ac, f.pr, f.ui, f.s, f.c, f.i, f.a,
+       f.score, f.severity, f.vector
+FROM findings f JOIN assets a ON a.pk = f.asset_id
+"""
+
+# assets.name is COLLATE NOCASE, which folds ASCII letters only: "Ärger" and
+# "ärger" are two assets. Python code that matches asset names uses the same rule.
+_NOCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+def fold_name(name: str) -> str:
+    """An asset name the way COLLATE NOCASE compares it, trimmed."""
+    return (name or "").strip().translate(_NOCASE)
+
+def _content_key(asset_name: str, title: str, metric_values: Sequence[str]) -> int:
+    text = "\x1f".join((
+        fold_name(asset_name),
+        " ".join((title or "").split()).casefold(),
+        *(v.upper() for v in metric_values),
+    ))
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+def content_key(asset_name: str, title: str, metrics: Dict[str, str]) -> int:
+    """Stable identity of a finding: its asset, title and vector, normalized.
+
+    Case and whitespace in the title do not matter, nor in the asset name
+    as far as assets.name compares equal (see fold_name()). The value is a
+    64-bit hash, unique in findings, so importing a scan twice matches rows
+    instead of adding copies.
+    """
+    return _content_key(asset_name, title, [metrics[k] for k in ("AV", "AC", "PR", "UI", "S", "C", "I", "A")])
+
+def finding_row(
     finding_id: str,
     asset_name: str,
     title: str,
@@ -98,55 +551,445 @@ def insert_finding(
     score: float,
     severity: str,
     vector: str,
-) -> None:
-    con = connect()
-    cur = con.cursor()
-    cur.execute("""
-    INSERT INTO findings(
-      id, asset_name, title,
-      av, ac, pr, ui, s, c, i, a,
-      score, severity, vector
-    )
-    VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-    """, (
+) -> Tuple[Any, ...]:
+    asset_name, title = asset_name.strip(), title.strip()
+    return (
         finding_id,
-        asset_name.strip(),
-        title.strip(),
+        asset_name,
+        title,
         metrics["AV"], metrics["AC"], metrics["PR"], metrics["UI"],
         metrics["S"], metrics["C"], metrics["I"], metrics["A"],
         float(score),
         severity,
         vector,
-    ))
-    con.commit()
-    con.close()
+        content_key(asset_name, title, metrics),
+    )
+
+def finding_id_for_key(key: int) -> Optional[str]:
+    r = connect().execute("SELECT id FROM findings WHERE content_key=?", (key,)).fetchone()
+    return r[0] if r is not None else None
+
+def insert_finding(
+    finding_id: str,
+    asset_name: str,
+    title: str,
+    metrics: Dict[str, str],
+    score: float,
+    severity: str,
+    vector: str,
+) -> None:
+    with transaction() as con:
+        con.execute(_INSERT_FINDING, finding_row(finding_id, asset_name, title, metrics, score, severity, vector))
 
 def delete_finding(finding_id: str) -> None:
-    con = connect()
-    cur = con.cursor()
-    cur.execute("DELETE FROM findings WHERE id=?", (finding_id,))
-    con.commit()
-    con.close()
+    with transaction() as con:
+        con.execute("DELETE FROM findings WHERE id=?", (finding_id,))
 
 def load_findings() -> List[Dict[str, Any]]:
-    con = connect()
-    cur = con.cursor()
-    rows = cur.execute("""
-    SELECT id, asset_name, title, av, ac, pr, ui, s, c, i, a, score, severity, vector
-    FROM findings
-    ORDER BY created_at DESC
+    rows = connect().execute(_SELECT_FINDINGS + "ORDER BY f.created_at, f.pk").fetchall()
+    return [_finding_dict(r) for r in rows]
+
+def iter_finding_rows() -> Iterator[Tuple[Any, ...]]:
+    """Plain (id, asset_name, title, av, ac, pr, ui, s, c, i, a) tuples in
+    load_findings() order (oldest first), without building per-row dicts."""
+    cur = connect().cursor()
+    cur.row_factory = None
+    yield from cur.execute("""
+    SELECT f.id, a.name, f.title, f.av, f.ac, f.pr, f.ui, f.s, f.c, f.i, f.a
+    FROM findings f JOIN assets a ON a.pk = f.asset_id
+    ORDER BY f.created_at, f.pk
+    """)
+
+def _finding_dict(r: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        "id": r["id"],
+        "asset_name": r["asset_name"],
+        "title": r["title"],
+        "metrics": {"AV": r["av"], "AC": r["ac"], "PR": r["pr"], "UI": r["ui"], "S": r["s"], "C": r["c"], "I": r["i"], "A": r["a"]},
+        "score": float(r["score"]),
+        "severity": r["severity"],
+        "vector": r["vector"],
+    }
+
+class UpsertResult(NamedTuple):
+    inserted: List[str]  # ids of the new findings, in input order
+    updated: List[Tuple[str, str]]  # (id, title) of existing findings that changed
+    unchanged: int  # rows that matched an existing finding (or an earlier row)
+    deleted: List[str]  # ids of findings removed by sync_findings()
+
+_STAGE_COLUMNS = FINDING_COLUMNS.replace("asset_name", "asset_name COLLATE NOCASE")
+# Rows that match an existing finding but differ in title text or a stale score.
+_STAGE_CHANGED = "f.title IS NOT s.title OR f.score IS NOT s.score OR f.severity IS NOT s.severity"
+
+def _upsert_chunk(cur: sqlite3.Cursor, rows: List[Tuple[Any, ...]]) -> UpsertResult:
+    """Stage rows in a temp table and merge them with set-based statements."""
+    # Repeats within the batch: the first row wins.
+    first: Dict[int, Tuple[Any, ...]] = {}
+    for row in rows:
+        first.setdefault(row[-1], row)
+
+    cur.execute(f"CREATE TEMP TABLE IF NOT EXISTS findings_stage(seq INTEGER PRIMARY KEY, {_STAGE_COLUMNS})")
+    cur.execute("DELETE FROM temp.findings_stage")
+    cur.executemany(
+        f"INSERT INTO temp.findings_stage({FINDING_COLUMNS}) VALUES({', '.join('?' * (FINDING_COLUMNS.count(',') + 1))})",
+        first.values(),
+    )
+
+    updated = cur.execute(f"""
+    SELECT f.id, s.title FROM temp.findings_stage s JOIN findings f ON f.content_key = s.content_key
+    WHERE {_STAGE_CHANGED} ORDER BY s.seq
     """).fetchall()
-    con.close()
-
-    out = []
-    for r in rows:
-        out.append({
-            "id": r["id"],
-            "asset_name": r["asset_name"],
-            "title": r["title"],
-            "metrics": {"AV": r["av"], "AC": r["ac"], "PR": r["pr"], "UI": r["ui"], "S": r["s"], "C": r["c"], "I": r["i"], "A": r["a"]},
-            "score": float(r["score"]),
-            "severity": r["severity"],
-            "vector": r["vector"],
-        })
-    return out
+    if updated:
+        cur.execute(f"""
+        UPDATE findings AS f SET title = s.title, score = s.score, severity = s.severity
+        FROM temp.findings_stage s WHERE f.content_key = s.content_key AND ({_STAGE_CHANGED})
+        """)
+
+    cur.execute("""
+    INSERT INTO findings(id, asset_id, title, av, ac, pr, ui, s, c, i, a, score, severity, vector, content_key)
+    SELECT s.id, a.pk, s.title, s.av, s.ac, s.pr, s.ui, s.s, s.c, s.i, s.a, s.score, s.severity, s.vector, s.content_key
+    FROM temp.findings_stage s LEFT JOIN assets a ON a.name = s.asset_name
+    WHERE NOT EXISTS (SELECT 1 FROM findings f WHERE f.content_key = s.content_key)
+    ORDER BY s.seq
+    """)
+    inserted = [r[0] for r in cur.execute("""
+    SELECT s.id FROM temp.findings_stage s WHERE EXISTS (SELECT 1 FROM findings f WHERE f.id = s.id) ORDER BY s.seq
+    """)]
+    return UpsertResult(
+        inserted=inserted,
+        updated=[(r[0], r[1]) for r in updated],
+        unchanged=len(rows) - len(inserted) - len(updated),
+        deleted=[],
+    )
+
+def insert_findings_bulk(
+    assets: Iterable[Tuple[str, str]],
+    findings: Iterable[Tuple[Any, ...]],
+    commit_every: Optional[int] = None,
+    on_commit: Optional[Callable[[UpsertResult], None]] = None,
+) -> UpsertResult:
+    """Insert new assets (id, name) and upsert finding rows on one connection.
+
+    Finding rows are tuples in FINDING_COLUMNS order (see finding_row()) and
+    their assets must already exist or be in `assets`; an asset whose name
+    is already stored keeps its stored id. A row whose content_key is
+    already stored is not inserted: the stored finding keeps its id and
+    takes the row's title, score and severity if they differ.
+    By default everything is one transaction; with `commit_every` the
+    findings are committed in chunks of that many rows. `on_commit` gets
+    each committed chunk's result, so callers can mirror what is stored
+    even if a later chunk fails.
+    """
+    con = connect()
+    try:
+        cur = con.cursor()
+        cur.row_factory = None
+        cur.executemany(
+            "INSERT OR IGNORE INTO assets(id, name, tags, services) VALUES(?, ?, '', '')",
+            [(aid, name.strip()) for aid, name in assets],
+        )
+        changed = cur.rowcount > 0
+
+        inserted: List[str] = []
+        updated: List[Tuple[str, str]] = []
+        unchanged = 0
+        rows = iter(findings)
+        while True:
+            chunk = list(islice(rows, commit_every)) if commit_every else list(rows)
+            r = _upsert_chunk(cur, chunk) if chunk else UpsertResult([], [], 0, [])
+            if changed or r.inserted or r.updated:
+                _bump_generation(con)
+            changed = False
+            con.commit()
+            if on_commit is not None:
+                on_commit(r)
+            inserted.extend(r.inserted)
+            updated.extend(r.updated)
+            unchanged += r.unchanged
+            if not commit_every or len(chunk) < commit_every:
+                break
+        return UpsertResult(inserted, updated, unchanged, [])
+    except BaseException:
+        con.rollback()
+        raise
+
+def sync_findings(
+    assets: Iterable[Tuple[str, str]],
+    findings: Iterable[Tuple[Any, ...]],
+    scope: Optional[Iterable[str]] = None,
+    on_commit: Optional[Callable[[UpsertResult], None]] = None,
+) -> UpsertResult:
+    """Make the stored findings of the `scope` assets match a full rescan.
+
+    Rows are upserted as in insert_findings_bulk(); findings of a scope asset
+    whose content_key is not among the rows are deleted. The scope defaults
+    to the assets named in the rows, so an asset missing from the scan keeps
+    its findings. The diff runs in SQL against the staging table and the
+    whole sync is one transaction: unchanged findings are not written.
+    `on_commit` is called with the result once it is committed.
+    """
+    con = connect()
+    try:
+        cur = con.cursor()
+        cur.row_factory = None
+        cur.executemany(
+            "INSERT OR IGNORE INTO assets(id, name, tags, services) VALUES(?, ?, '', '')",
+            [(aid, name.strip()) for aid, name in assets],
+        )
+        changed = cur.rowcount > 0
+        r = _upsert_chunk(cur, list(findings))
+
+        cur.execute("CREATE TEMP TABLE IF NOT EXISTS sync_scope(name TEXT PRIMARY KEY COLLATE NOCASE)")
+        cur.execute("DELETE FROM temp.sync_scope")
+        if scope is None:
+            cur.execute("INSERT OR IGNORE INTO temp.sync_scope SELECT DISTINCT asset_name FROM temp.findings_stage")
+        else:
+            cur.executemany("INSERT OR IGNORE INTO temp.sync_scope VALUES(?)", [(n.strip(),) for n in scope])
+        deleted = [row[0] for row in cur.execute("""
+        DELETE FROM findings
+        WHERE asset_id IN (SELECT a.pk FROM assets a JOIN temp.sync_scope s ON a.name = s.name)
+          AND content_key NOT IN (SELECT content_key FROM temp.findings_stage)
+        RETURNING id
+        """).fetchall()]
+        if changed or r.inserted or r.updated or deleted:
+            _bump_generation(con)
+        con.commit()
+        r = r._replace(deleted=deleted)
+        if on_commit is not None:
+            on_commit(r)
+        return r
+    except BaseException:
+        con.rollback()
+        raise
+
+# Indexed queries for the SQL-backed store (storage.SqlStore).
+
+ASSET_ORDER = {
+    "recent": "a.created_at DESC, a.pk DESC",
+    "name": "a.name",
+}
+
+def count_assets() -> int:
+    return connect().execute("SELECT COUNT(*) FROM assets").fetchone()[0]
+
+def get_asset(asset_id: str) -> Optional[Dict[str, Any]]:
+    r = connect().execute("SELECT id,name,tags,services FROM assets WHERE id=?", (asset_id,)).fetchone()
+    return _asset_dict(r) if r is not None else None
+
+def get_asset_by_name(name: str) -> Optional[Dict[str, Any]]:
+    r = connect().execute("SELECT id,name,tags,services FROM assets WHERE name=?", (name.strip(),)).fetchone()
+    return _asset_dict(r) if r is not None else None
+
+def asset_names() -> List[str]:
+    return [r[0] for r in connect().execute("SELECT name FROM assets ORDER BY pk")]
+
+def assets_page(offset: int, limit: int, sort: str = "recent") -> List[Dict[str, Any]]:
+    if sort == "score":
+        sql = """
+        SELECT a.id, a.name, a.tags, a.services
+        FROM assets a
+        LEFT JOIN asset_risk_summary r ON r.asset_id = a.pk
+        ORDER BY COALESCE(r.max_score, 0) DESC, COALESCE(r.n, 0) DESC, a.name
+        LIMIT ? OFFSET ?
+        """
+    elif sort in ASSET_ORDER:
+        sql = f"SELECT a.id, a.name, a.tags, a.services FROM assets a ORDER BY {ASSET_ORDER[sort]} LIMIT ? OFFSET ?"
+    else:
+        raise ValueError(f"Unknown asset sort: {sort}")
+    return [_asset_dict(r) for r in connect().execute(sql, (limit, offset))]
+
+def get_finding(finding_id: str) -> Optional[Dict[str, Any]]:
+    r = connect().execute(_SELECT_FINDINGS + "WHERE f.id=?", (finding_id,)).fetchone()
+    return _finding_dict(r) if r is not None else None
+
+def findings_for_asset(asset_name: str, offset: int = 0, limit: int = -1) -> List[Dict[str, Any]]:
+    rows = connect().execute(
+        _SELECT_FINDINGS + """
+        WHERE f.asset_id = (SELECT pk FROM assets WHERE name=?)
+        ORDER BY f.score DESC, f.pk
+        LIMIT ? OFFSET ?
+        """,
+        (asset_name.strip(), limit, offset),
+    )
+    return [_finding_dict(r) for r in rows]
+
+def finding_ids_for_asset(asset_name: str) -> List[str]:
+    rows = connect().execute(
+        "SELECT id FROM findings WHERE asset_id = (SELECT pk FROM assets WHERE name=?)", (asset_name.strip(),)
+    )
+    return [r[0] for r in rows]
+
+def latest_findings(limit: int) -> List[Dict[str, Any]]:
+    rows = connect().execute(_SELECT_FINDINGS + "ORDER BY f.created_at DESC, f.pk DESC LIMIT ?", (limit,))
+    return [_finding_dict(r) for r in rows]
+
+def top_findings(limit: int) -> List[Dict[str, Any]]:
+    """The `limit` highest-scoring findings, read in order off idx_findings_score."""
+    rows = connect().execute(_SELECT_FINDINGS + "ORDER BY f.score DESC, f.pk LIMIT ?", (limit,))
+    return [_finding_dict(r) for r in rows]
+
+def finding_ids_by_score(limit: int, offset: int = 0, asset_name: Optional[str] = None) -> List[str]:
+    """Ids of a page of findings (of one asset, or all), highest score first."""
+    if asset_name is None:
+        sql, params = "SELECT id FROM findings ORDER BY score DESC, pk LIMIT ? OFFSET ?", (limit, offset)
+    else:
+        sql = """
+        SELECT id FROM findings WHERE asset_id = (SELECT pk FROM assets WHERE name=?)
+        ORDER BY score DESC, pk LIMIT ? OFFSET ?
+        """
+        params = (asset_name.strip(), limit, offset)
+    return [r[0] for r in connect().execute(sql, params)]
+
+def iter_findings(asset_names: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+    if asset_names is None:
+        cur = connect().execute(_SELECT_FINDINGS + "ORDER BY f.pk")
+    else:
+        names = [n.strip() for n in asset_names]
+        marks = ",".join("?" * len(names))
+        cur = connect().execute(_SELECT_FINDINGS + f"WHERE a.name IN ({marks}) ORDER BY f.pk", names)
+    for r in cur:
+        yield _finding_dict(r)
+
+# Ranking sorts every match by bm25; above this many matches results come
+# newest first instead, which FTS5 streams without scoring them all.
+SEARCH_RANK_LIMIT = 10_000
+
+class SearchResult(NamedTuple):
+    total: int  # all matches
+    rows: List[Dict[str, Any]]  # the requested page, as load_findings() dicts
+
+def _has_search_index(cur: sqlite3.Cursor) -> bool:
+    return cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='trigger' AND name=?", (_FTS_TRIGGERS[0],)
+    ).fetchone() is not None
+
+def _search_words(query: str) -> List[str]:
+    return [w for w in (query or "").split() if re.search(r"\w", w)]
+
+def _match_query(words: List[str]) -> str:
+    # Each word is a quoted phrase, so user input can't inject FTS5 syntax
+    # ("host-01" matches host followed by 01). The last word is a prefix.
+    phrases = ['"' + w.replace('"', '""') + '"' for w in words]
+    phrases[-1] += "*"
+    return " ".join(phrases)
+
+def _like_filter(words: List[str]) -> Tuple[str, List[str]]:
+    """WHERE clause and params: every word in the title or the asset name."""
+    patterns = ["%" + w.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%" for w in words]
+    where = " AND ".join("(f.title LIKE ? ESCAPE '\\' OR a.name LIKE ? ESCAPE '\\')" for _ in words)
+    return where, [p for p in patterns for _ in (0, 1)]
+
+def search_findings(query: str, offset: int = 0, limit: int = 50) -> SearchResult:
+    """Findings whose title or asset name contain every word of `query`.
+
+    Uses the findings_fts index: best bm25 match first (newest first past
+    SEARCH_RANK_LIMIT matches), and only the requested page is read from
+    the findings table. Without FTS5 this is a LIKE scan ordered by score.
+    """
+    words = _search_words(query)
+    if not words:
+        return SearchResult(0, [])
+    cur = connect().cursor()
+    if not _has_search_index(cur):
+        where, params = _like_filter(words)
+        total = cur.execute(
+            f"SELECT COUNT(*) FROM findings f JOIN assets a ON a.pk = f.asset_id WHERE {where}", params
+        ).fetchone()[0]
+        rows = cur.execute(
+            _SELECT_FINDINGS + f"WHERE {where} ORDER BY f.score DESC, f.pk LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        )
+        return SearchResult(total, [_finding_dict(r) for r in rows])
+
+    match = _match_query(words)
+    total = cur.execute("SELECT COUNT(*) FROM findings_fts WHERE findings_fts MATCH ?", (match,)).fetchone()[0]
+    if total <= SEARCH_RANK_LIMIT:
+        matches = "SELECT rowid, rank AS k FROM findings_fts WHERE findings_fts MATCH ? ORDER BY rank"
+    else:
+        matches = "SELECT rowid, -rowid AS k FROM findings_fts WHERE findings_fts MATCH ? ORDER BY rowid DESC"
+    # Order and page inside the FTS table, then join just that page.
+    rows = cur.execute(f"""
+    SELECT f.id, a.name AS asset_name, f.title, f.av, f.ac, f.pr, f.ui, f.s, f.c, f.i, f.a,
+           f.score, f.severity, f.vector
+    FROM ({matches} LIMIT ? OFFSET ?) m
+    JOIN findings f ON f.pk = m.rowid
+    JOIN assets a ON a.pk = f.asset_id
+    ORDER BY m.k
+    """, (match, limit, offset))
+    return SearchResult(total, [_finding_dict(r) for r in rows])
+
+def iter_export_rows(asset_names: Optional[List[str]] = None, batch_size: int = 1000) -> Iterator[List[Tuple[Any, ...]]]:
+    """Findings as batches of (id, asset_name, title, score, severity, vector,
+    av, ac, pr, ui, s, c, i, a) tuples, highest score first.
+
+    Rows come straight off the cursor with fetchmany(), so memory stays at
+    one batch however many findings there are. The asset filter runs in SQL
+    on idx_findings_asset_score.
+    """
+    sql = """
+    SELECT f.id, a.name, f.title, f.score, f.severity, f.vector, f.av, f.ac, f.pr, f.ui, f.s, f.c, f.i, f.a
+    FROM findings f JOIN assets a ON a.pk = f.asset_id
+    """
+    params: List[str] = []
+    if asset_names is not None:
+        params = [n.strip() for n in asset_names]
+        sql += f"WHERE f.asset_id IN (SELECT pk FROM assets WHERE name IN ({','.join('?' * len(params))}))\n"
+    cur = connect().cursor()
+    cur.row_factory = None
+    cur.execute(sql + "ORDER BY f.score DESC, f.pk", params)
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+def _risk_counts(r: Optional[sqlite3.Row]) -> Dict[str, int]:
+    return {sev: (r[col] if r is not None else 0) for sev, col in _SEVERITY_COLUMNS}
+
+def severity_counts() -> Dict[str, int]:
+    return _risk_counts(connect().execute("SELECT * FROM risk_totals WHERE id=1").fetchone())
+
+def _risk_dict(r: Optional[sqlite3.Row]) -> Dict[str, Any]:
+    n = r["n"] if r is not None and r["n"] is not None else 0
+    return {
+        "count": n,
+        "max_score": float(r["max_score"]) if n else 0.0,
+        "avg_score": r["total10"] / n / 10.0 if n else 0.0,
+        "counts": _risk_counts(r) if n else _risk_counts(None),
+    }
+
+def asset_risk(asset_name: str) -> Dict[str, Any]:
+    r = connect().execute(
+        "SELECT r.* FROM assets a JOIN asset_risk_summary r ON r.asset_id = a.pk WHERE a.name=?",
+        ((asset_name or "").strip(),),
+    ).fetchone()
+    return _risk_dict(r)
+
+def risk_by_asset(asset_names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """asset_risk() plus "asset" for every (or the named) asset, riskiest first."""
+    sql = "SELECT a.name AS asset, r.* FROM assets a LEFT JOIN asset_risk_summary r ON r.asset_id = a.pk"
+    params: List[str] = []
+    if asset_names is not None:
+        params = [n.strip() for n in asset_names]
+        sql += f" WHERE a.name IN ({','.join('?' * len(params))})"
+    sql += " ORDER BY COALESCE(r.max_score, 0) DESC, COALESCE(r.n, 0) DESC, a.name"
+    return [{"asset": r["asset"], **_risk_dict(r)} for r in connect().execute(sql, params)]
+
+def update_scores(rows: Iterable[Tuple[float, str, str, str]]) -> int:
+    """Apply (score, severity, vector, finding_id) updates; returns rows changed."""
+    with transaction() as con:
+        cur = con.executemany("UPDATE findings SET score=?, severity=?, vector=? WHERE id=?", rows)
+        return cur.rowcount
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="RiskMapper database maintenance")
+    ap.add_argument("command", choices=["rebuild-summary", "rebuild-search"])
+    ap.add_argument("--db", default=DB_PATH)
+    args = ap.parse_args()
+    DB_PATH = args.db
+    if args.command == "rebuild-search":
+        rebuild_search_index()
+    else:
+        rebuild_risk_summary()
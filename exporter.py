@@ -0,0 +1,70 @@
+"""Streaming findings export: CSV, JSON array or NDJSON, highest score first.
+
+Rows are read from SQLite in batches and written as they arrive, so exports
+run in constant memory whatever the size of the database.
+"""
+import csv
+import json
+import os
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+import db
+
+EXPORT_HEADER = ["id", "asset", "title", "score", "severity", "vector", "AV", "AC", "PR", "UI", "S", "C", "I", "A"]
+FORMATS = ("csv", "json", "ndjson")
+EXPORT_BATCH = 1000
+
+def detect_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".ndjson", ".jsonl"):
+        return "ndjson"
+    return "json" if ext == ".json" else "csv"
+
+def _record(r: Tuple[Any, ...]) -> Dict[str, Any]:
+    return {**dict(zip(EXPORT_HEADER, r)), "score": float(r[3])}
+
+def write_export(
+    out: TextIO,
+    fmt: str = "csv",
+    asset_names: Optional[List[str]] = None,
+    batch_size: int = EXPORT_BATCH,
+) -> int:
+    """Write findings (optionally only those of `asset_names`) to `out`.
+
+    Returns the number of findings written.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    n = 0
+    batches = db.iter_export_rows(asset_names, batch_size)
+
+    if fmt == "csv":
+        w = csv.writer(out, delimiter=";")
+        w.writerow(EXPORT_HEADER)
+        for rows in batches:
+            w.writerows((r[0], r[1], r[2], f"{r[3]:.1f}", *r[4:]) for r in rows)
+            n += len(rows)
+        return n
+
+    if fmt == "ndjson":
+        for rows in batches:
+            out.write("".join(json.dumps(_record(r)) + "\n" for r in rows))
+            n += len(rows)
+        return n
+
+    out.write("[")
+    for rows in batches:
+        out.write(("," if n else "") + ",".join("\n  " + json.dumps(_record(r)) for r in rows))
+        n += len(rows)
+    out.write("\n]\n" if n else "]\n")
+    return n
+
+def export_file(
+    path: str,
+    fmt: Optional[str] = None,
+    asset_names: Optional[List[str]] = None,
+    batch_size: int = EXPORT_BATCH,
+) -> int:
+    """write_export() to `path`; the format defaults to the file extension."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        return write_export(f, fmt or detect_format(path), asset_names, batch_size)
@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from cvss import calculate_base_scores, decode_metrics, result_for_code, vector_for_code
+from parser import (
+    CHUNK_SIZE,
+    ReadProgress,
+    RowError,
+    iter_csv_file,
+    iter_json_file,
+    parse_csv_text,
+    parse_json_text,
+)
+from storage import Store
+
+@dataclass
+class ImportSummary:
+    imported: int = 0  # new findings
+    updated: int = 0  # already stored (same content key), title or score refreshed
+    unchanged: int = 0  # already stored as is
+    deleted: int = 0  # sync only: stored findings of the scope missing from the scan
+    skipped: int = 0
+    assets_created: int = 0
+    seconds: float = 0.0
+    errors: List[RowError] = field(default_factory=list)
+    cancelled: bool = False
+    read: ReadProgress = field(default_factory=ReadProgress)
+
+    @property
+    def rows_per_sec(self) -> float:
+        total = self.imported + self.updated + self.unchanged + self.skipped
+        return total / self.seconds if self.seconds > 0 else 0.0
+
+def finding_item(asset_name: str, title: str, code: int) -> Dict[str, Any]:
+    """Store.add_findings_bulk() item for a scored metric code."""
+    res = result_for_code(code)
+    return {
+        "asset_name": asset_name,
+        "title": title,
+        "metrics": decode_metrics(code),
+        "code": code,
+        "score": res.score,
+        "severity": res.severity,
+        "vector": vector_for_code(code),
+    }
+
+def score_rows(rows: List[Dict[str, str]]) -> Iterator[Dict[str, Any]]:
+    """Score parsed rows and yield Store.add_findings_bulk() items.
+
+    Invalid rows are dropped; use calculate_base_scores() directly to see why.
+    """
+    scores = calculate_base_scores(rows)
+    for item, code in zip(rows, scores.codes):
+        if code >= 0:
+            yield finding_item(item["asset"], item["title"], code)
+
+ProgressCallback = Callable[[ImportSummary], None]
+
+def import_chunks(
+    store: Store,
+    chunks: Iterable[List[Dict[str, str]]],
+    summary: Optional[ImportSummary] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    cancel: Optional[threading.Event] = None,
+) -> ImportSummary:
+    """Score and bulk-insert parsed rows, one transaction per chunk.
+
+    `on_progress` is called after every committed chunk. Setting `cancel`
+    stops before the next chunk: chunks already committed stay, nothing of a
+    later chunk is written, and the summary comes back with cancelled=True.
+    """
+    started = time.perf_counter()
+    summary = summary or ImportSummary()
+    for rows in chunks:
+        if cancel is not None and cancel.is_set():
+            summary.cancelled = True
+            break
+        result = store.add_findings_bulk(score_rows(rows))
+        summary.imported += result.inserted
+        summary.updated += result.updated
+        summary.unchanged += result.unchanged
+        summary.skipped += len(rows) - result.inserted - result.updated - result.unchanged
+        summary.assets_created += result.assets_created
+        summary.seconds = time.perf_counter() - started
+        if on_progress is not None:
+            on_progress(summary)
+    summary.skipped += len(summary.errors)
+    summary.seconds = time.perf_counter() - started
+    return summary
+
+def sync_chunks(
+    store: Store,
+    chunks: Iterable[List[Dict[str, str]]],
+    summary: Optional[ImportSummary] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    cancel: Optional[threading.Event] = None,
+    scope: Optional[List[str]] = None,
+) -> ImportSummary:
+    """Sync the stored findings of `scope` with a full scan (see Store.sync_findings()).
+
+    The whole scan is scored first and written in a single transaction, so
+    `on_progress` only tracks reading and a cancelled sync writes nothing.
+    """
+    started = time.perf_counter()
+    summary = summary or ImportSummary()
+    items: List[Dict[str, Any]] = []
+    rows_read = 0
+    for rows in chunks:
+        if cancel is not None and cancel.is_set():
+            summary.cancelled = True
+            break
+        items.extend(score_rows(rows))
+        rows_read += len(rows)
+        summary.seconds = time.perf_counter() - started
+        if on_progress is not None:
+            on_progress(summary)
+    if not summary.cancelled:
+        result = store.sync_findings(items, scope)
+        summary.imported = result.inserted
+        summary.updated = result.updated
+        summary.unchanged = result.unchanged
+        summary.deleted = result.deleted
+        summary.skipped = rows_read - result.inserted - result.updated - result.unchanged
+        summary.assets_created = result.assets_created
+    summary.skipped += len(summary.errors)
+    summary.seconds = time.perf_counter() - started
+    return summary
+
+JSON_EXTENSIONS = (".json", ".ndjson", ".jsonl")
+
+def detect_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    return "json" if ext in JSON_EXTENSIONS else "csv"
+
+def iter_file_chunks(
+    path: str,
+    fmt: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE,
+    errors: Optional[List[RowError]] = None,
+    progress: Optional[ReadProgress] = None,
+) -> Iterator[List[Dict[str, str]]]:
+    fmt = fmt or detect_format(path)
+    if fmt == "csv":
+        return iter_csv_file(path, chunk_size=chunk_size, progress=progress)
+    return iter_json_file(path, chunk_size=chunk_size, errors=errors, progress=progress)
+
+def import_file(
+    store: Store,
+    path: str,
+    fmt: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE,
+    on_progress: Optional[ProgressCallback] = None,
+    cancel: Optional[threading.Event] = None,
+    sync: bool = False,
+    scope: Optional[List[str]] = None,
+) -> ImportSummary:
+    """Import a findings file; with `sync`, through sync_chunks()."""
+    summary = ImportSummary()
+    chunks = iter_file_chunks(path, fmt, chunk_size, summary.errors, summary.read)
+    if sync:
+        return sync_chunks(store, chunks, summary, on_progress, cancel, scope)
+    return import_chunks(store, chunks, summary, on_progress, cancel)
+
+def import_text(
+    store: Store,
+    text: str,
+    fmt: str = "csv",
+    on_progress: Optional[ProgressCallback] = None,
+    cancel: Optional[threading.Event] = None,
+    sync: bool = False,
+    scope: Optional[List[str]] = None,
+) -> ImportSummary:
+    rows = parse_csv_text(text) if fmt == "csv" else parse_json_text(text)
+    summary = ImportSummary(read=ReadProgress(total=len(rows)))
+
+    def chunks() -> Iterator[List[Dict[str, str]]]:
+        for i in range(0, len(rows), CHUNK_SIZE):
+            summary.read.done = min(i + CHUNK_SIZE, len(rows))
+            yield rows[i:i + CHUNK_SIZE]
+
+    if sync:
+        return sync_chunks(store, chunks(), summary, on_progress, cancel, scope)
+    return import_chunks(store, chunks(), summary, on_progress, cancel)
@@ -1,12 +1,12 @@
+import threading
+import time
+
 import flet as ft
-import pyperclip
-import csv
-import io
 
 from cvss import calculate_base_score, METRIC_FIELDS, vector_string
-from parser import parse_csv_text, parse_json_text
-from storage import Store
-from ui_components import pill, section_title, info_card, toast_bar
+import db
+from storage import SEVERITY_ORDER, Finding, StoreChange, name_key, open_store
+from ui_components import pill, section_title, info_card, toast_bar, pager
 
 
 METRIC_OPTIONS = {
@@ -32,6 +32,20 @@ METRIC_LABELS = {
 }
 
 
+PAGE_SIZES = [25, 50, 100, 200]
+
+ASSET_SORTS = [("recent", "Most recent"), ("name", "Name"), ("score", "Max score")]
+
+SEARCH_PAGE_SIZE = 20
+# Seconds of typing pause before the search box queries the index.
+SEARCH_DEBOUNCE = 0.3
+# Rows in the dashboard's "Top Risks" and "Latest Findings" panels.
+DASHBOARD_ROWS = 10
+
+# Minimum seconds between UI refreshes while a background import is running.
+IMPORT_UI_INTERVAL = 0.25
+
+
 def split_csv_field(s: str):
     return [x.strip() for x in (s or "").split(",") if x.strip()]
 
@@ -67,8 +81,12 @@ def main(page: ft.Page):
         actions=[theme_btn],
     )
 
-    store = Store()
-    store.load_from_db()
+    # The store is loaded in the background once the first frame is up (see
+    # the end of main()); until then the dashboard reads the SQL aggregates.
+    store = open_store()
+    db.init_db()
+    page.on_disconnect = lambda e: db.close_all()
+    startup_state = {"ready": False, "built": {0}}
 
     def notify(msg: str, kind: str = "info"):
         sb = toast_bar(msg, kind)
@@ -86,68 +104,47 @@ def main(page: ft.Page):
             pass
 
         try:
+            import pyperclip
+
             pyperclip.copy(text)
             notify("Copied to clipboard ✅", "success")
         except Exception as ex:
             notify(f"Clipboard copy failed: {ex}", "error")
 
-    export_picker = ft.FilePicker()
-    page.overlay.append(export_picker)
+    pickers = {}
 
-    assets_export_picker = ft.FilePicker()
-    page.overlay.append(assets_export_picker)
+    def picker(key: str, on_result) -> ft.FilePicker:
+        """File picker created (and added to the overlay) on first use."""
+        fp = pickers.get(key)
+        if fp is None:
+            fp = pickers[key] = ft.FilePicker(on_result=on_result)
+            page.overlay.append(fp)
+            page.update()
+        return fp
 
     assets_export_ctx = {"asset_names": []}
 
-    def build_findings_csv() -> str:
-        output = io.StringIO()
-        w = csv.writer(output, delimiter=';')
-        w.writerow(["id", "asset", "title", "score", "severity", "vector", "AV", "AC", "PR", "UI", "S", "C", "I", "A"])
-
-        sorted_findings = sorted(store.findings.values(), key=lambda x: x.score, reverse=True)
-        for f in sorted_findings:
-            m = f.metrics
-            w.writerow([
-                f.id, f.asset_name, f.title, f"{f.score:.1f}", f.severity, getattr(f, "vector", ""),
-                m["AV"], m["AC"], m["PR"], m["UI"], m["S"], m["C"], m["I"], m["A"]
-            ])
-        return output.getvalue()
-
-    def build_findings_csv_for_assets(asset_names: list[str]) -> str:
-        output = io.StringIO()
-        w = csv.writer(output, delimiter=';')
-        w.writerow(["id", "asset", "title", "score", "severity", "vector", "AV", "AC", "PR", "UI", "S", "C", "I", "A"])
-
-        selected_set = {a.strip().lower() for a in asset_names if a and a.strip()}
-        findings = [
-            f for f in store.findings.values()
-            if f.asset_name.strip().lower() in selected_set
-        ]
-        findings.sort(key=lambda x: x.score, reverse=True)
-
-        for f in findings:
-            m = f.metrics
-            w.writerow([
-                f.id, f.asset_name, f.title, f"{f.score:.1f}", f.severity, getattr(f, "vector", ""),
-                m["AV"], m["AC"], m["PR"], m["UI"], m["S"], m["C"], m["I"], m["A"]
-            ])
-
-        return output.getvalue()
-
     def on_export_result(e: ft.FilePickerResultEvent):
         if not e.path:
             return
+        import exporter
+
         try:
-            csv_text = build_findings_csv()
-            with open(e.path, "w", encoding="utf-8", newline="") as f:
-                f.write(csv_text)
-            notify(f"CSV exported ✅\n{e.path}", "success")
+            n = exporter.export_file(e.path)
+            notify(f"{n} findings exported ✅\n{e.path}", "success")
         except Exception as ex:
             notify(f"Export failed: {ex}", "error")
 
-    export_picker.on_result = on_export_result
+    def export_all():
+        # Streams from SQL (exporter), so it works while the store loads.
+        picker("export", on_export_result).save_file(
+            file_name="riskmapper_findings.csv",
+            allowed_extensions=["csv", "json", "ndjson"],
+        )
 
     def on_assets_export_result(e: ft.FilePickerResultEvent):
+        import exporter
+
         if not e.path:
             return
         try:
@@ -156,78 +153,155 @@ def main(page: ft.Page):
                 notify("No assets selected.", "warning")
                 return
 
-            csv_text = build_findings_csv_for_assets(names)
-            with open(e.path, "w", encoding="utf-8", newline="") as f:
-                f.write(csv_text)
-
-            notify(f"Selected assets CSV exported ✅\n{e.path}", "success")
+            n = exporter.export_file(e.path, asset_names=[a for a in names if a and a.strip()])
+            notify(f"{n} findings from selected assets exported ✅\n{e.path}", "success")
         except Exception as ex:
             notify(f"Export failed: {ex}", "error")
 
-    assets_export_picker.on_result = on_assets_export_result
 
 
-    dash_counts = ft.Column(spacing=6)
+    dash_count_texts = {sev: ft.Text("0") for sev in SEVERITY_ORDER}
+    dash_counts = ft.Column(
+        [ft.Row([ft.Text(sev, width=90), dash_count_texts[sev]]) for sev in SEVERITY_ORDER],
+        spacing=6,
+    )
     dash_latest = ft.Column(spacing=8, scroll=ft.ScrollMode.AUTO, height=270)
+    dash_top = ft.Column(spacing=8, scroll=ft.ScrollMode.AUTO, height=270)
+
+    search_state = {"query": "", "page": 0, "timer": None}
+    search_results = ft.Column(spacing=8)
+    search_page_label = ft.Text("", opacity=0.8)
 
     def go_tab(i: int):
         tabs.selected_index = i
+        show_tab(i)
         tabs.update()
 
+    def refresh_counts():
+        c = store.severity_counts() if startup_state["ready"] else db.severity_counts()
+        for sev, txt in dash_count_texts.items():
+            txt.value = str(c.get(sev, 0))
+
     def rebuild_dashboard():
-        dash_counts.controls.clear()
-        c = store.severity_counts()
-        dash_counts.controls.extend([
-            ft.Row([ft.Text("Critical", width=90), ft.Text(str(c["Critical"]))]),
-            ft.Row([ft.Text("High", width=90), ft.Text(str(c["High"]))]),
-            ft.Row([ft.Text("Medium", width=90), ft.Text(str(c["Medium"]))]),
-            ft.Row([ft.Text("Low", width=90), ft.Text(str(c["Low"]))]),
-            ft.Row([ft.Text("None", width=90), ft.Text(str(c["None"]))]),
-        ])
-
-        dash_latest.controls.clear()
-        findings = list(store.findings.values())[-10:]
+        refresh_counts()
+        rebuild_latest()
+        rebuild_search()
+        page.update()
+
+    def finding_summary_row(f):
+        """Clickable asset / title / score row; opens the asset's details."""
+        try:
+            res = calculate_base_score(f.metrics)
+            impact_txt = f"I:{res.impact:.1f}"
+            explo_txt = f"E:{res.exploitability:.1f}"
+        except Exception:
+            impact_txt = "I:—"
+            explo_txt = "E:—"
+
+        return ft.Container(
+            content=ft.Row(
+                [
+                    ft.Text(f.asset_name, width=200),
+                    ft.Text(f.title, expand=True),
+                    ft.Text(impact_txt, width=70, text_align=ft.TextAlign.RIGHT, opacity=0.85),
+                    ft.Text(explo_txt, width=70, text_align=ft.TextAlign.RIGHT, opacity=0.85),
+                    ft.Container(content=pill(f.severity, f.score), margin=ft.margin.only(left=8)),
+                ],
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+            ),
+            on_click=lambda e, an=f.asset_name: (
+                show_asset(store.get_asset_by_name(an)),
+                go_tab(3),
+            ),
+            ink=True,
+            padding=10,
+            border=ft.border.all(1, ft.colors.with_opacity(0.12, ft.colors.WHITE)),
+            border_radius=14,
+        )
+
+    def rebuild_latest():
+        # Both panels cost DASHBOARD_ROWS rows, however many findings are stored.
+        if startup_state["ready"]:
+            latest = store.latest_findings(DASHBOARD_ROWS)
+            top = store.top_findings(DASHBOARD_ROWS)
+        else:
+            latest = [Finding(**f) for f in db.latest_findings(DASHBOARD_ROWS)]
+            top = [Finding(**f) for f in db.top_findings(DASHBOARD_ROWS)]
+        for panel, findings in ((dash_latest, latest), (dash_top, top)):
+            panel.controls.clear()
+            if not findings:
+                panel.controls.append(ft.Text("No findings yet. Use Calculator or Import.", opacity=0.8))
+            else:
+                panel.controls.extend(finding_summary_row(f) for f in findings)
+
+    def rebuild_search():
+        search_results.controls.clear()
+        query = search_state["query"]
+        if not query:
+            search_page_label.value = ""
+            return
+
+        # Ranked and paged in SQLite; only the visible page is fetched.
+        offset = search_state["page"] * SEARCH_PAGE_SIZE
+        if startup_state["ready"]:
+            total, findings = store.search_findings(query, offset, SEARCH_PAGE_SIZE)
+        else:
+            total, rows = db.search_findings(query, offset, SEARCH_PAGE_SIZE)
+            findings = [Finding(**f) for f in rows]
+        last_page = max(total - 1, 0) // SEARCH_PAGE_SIZE
+        if not findings and search_state["page"] > last_page:
+            # Past the end after deletions: show the last page instead.
+            search_state["page"] = last_page
+            return rebuild_search()
+
+        search_page_label.value = f"{offset + 1}–{offset + len(findings)} of {total}" if findings else "0 of 0"
         if not findings:
-            dash_latest.controls.append(ft.Text("No findings yet. Use Calculator or Import.", opacity=0.8))
+            search_results.controls.append(ft.Text("No matching findings.", opacity=0.8))
         else:
-            for f in reversed(findings):
-                try:
-                    res = calculate_base_score(f.metrics)
-                    impact_txt = f"I:{res.impact:.1f}"
-                    explo_txt = f"E:{res.exploitability:.1f}"
-                except Exception:
-                    impact_txt = "I:—"
-                    explo_txt = "E:—"
+            search_results.controls.extend(finding_summary_row(f) for f in findings)
 
-                dash_latest.controls.append(
-                    ft.Container(
-                        content=ft.Row(
-                            [
-                                ft.Text(f.asset_name, width=200),
-                                ft.Text(f.title, expand=True),
-                                ft.Text(impact_txt, width=70, text_align=ft.TextAlign.RIGHT, opacity=0.85),
-                                ft.Text(explo_txt, width=70, text_align=ft.TextAlign.RIGHT, opacity=0.85),
-                                ft.Container(content=pill(f.severity, f.score), margin=ft.margin.only(left=8)),
-                            ],
-                            alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                        ),
-                        on_click=lambda e, an=f.asset_name: (
-                            (last_selected_asset.__setitem__("id", store.get_asset_by_name(an).id) # type: ignore
-                             if store.get_asset_by_name(an) is not None
-                             else last_selected_asset.__setitem__("id", None)),
-                            go_tab(3),
-                            rebuild_assets_list(),
-                            rebuild_asset_detail(),
-                            page.update()
-                        ),
-                        ink=True,
-                        padding=10,
-                        border=ft.border.all(1, ft.colors.with_opacity(0.12, ft.colors.WHITE)),
-                        border_radius=14,
-                    )
-                )
+    def run_search(force: bool = False):
+        query = (search_field.value or "").strip()
+        if query == search_state["query"] and not force:
+            return
+        search_state["query"] = query
+        search_state["page"] = 0
+        rebuild_search()
         page.update()
 
+    def cancel_search_timer():
+        if search_state["timer"] is not None:
+            search_state["timer"].cancel()
+            search_state["timer"] = None
+
+    def on_search_change(e):
+        # Query once typing pauses, not on every keystroke.
+        cancel_search_timer()
+        timer = threading.Timer(SEARCH_DEBOUNCE, run_search)
+        timer.daemon = True
+        search_state["timer"] = timer
+        timer.start()
+
+    def on_search_submit(e):
+        cancel_search_timer()
+        run_search(force=True)
+
+    def go_search_page(delta: int):
+        if not search_state["query"]:
+            return
+        new_page = max(search_state["page"] + delta, 0)
+        if new_page != search_state["page"]:
+            search_state["page"] = new_page
+            rebuild_search()
+        page.update()
+
+    search_field = ft.TextField(
+        label="Search findings by title or asset",
+        prefix_icon=ft.icons.SEARCH,
+        on_change=on_search_change,
+        on_submit=on_search_submit,
+    )
+
     dashboard_view = ft.Column(
         [
             section_title("Dashboard"),
@@ -250,10 +324,7 @@ def main(page: ft.Page):
                                         ft.ElevatedButton(
                                             "Export Findings to CSV",
                                             icon=ft.icons.DOWNLOAD,
-                                            on_click=lambda e: export_picker.save_file(
-                                                file_name="riskmapper_findings.csv",
-                                                allowed_extensions=["csv"],
-                                            ),
+                                            on_click=lambda e: export_all(),
                                         ),
                                     ],
                                     spacing=10,
@@ -263,6 +334,18 @@ def main(page: ft.Page):
                     ),
                 ]
             ),
+            info_card(
+                "Search Findings",
+                ft.Column(
+                    [
+                        search_field,
+                        search_results,
+                        pager(search_page_label, lambda e: go_search_page(-1), lambda e: go_search_page(1)),
+                    ],
+                    spacing=8,
+                ),
+            ),
+            info_card("Top Risks", dash_top),
             info_card("Latest Findings", dash_latest),
         ],
         spacing=16,
@@ -325,7 +408,6 @@ def main(page: ft.Page):
                     severity=res.severity,
                     vector=vec,
                 )
-                rebuild_all()
                 notify("Finding saved.", "success")
 
             page.update()
@@ -333,35 +415,36 @@ def main(page: ft.Page):
         except Exception as ex:
             notify(str(ex), "error")
 
-    calculator_view = ft.Column(
-        [
-            section_title("CVSS v3.1 Calculator"),
-            info_card("Finding Info", ft.Column([calc_asset_dropdown, calc_asset_custom, calc_title], spacing=10)),
-            info_card(
-                "Base Metrics",
+    def build_calculator_view():
+        return ft.Column(
+            [
+                section_title("CVSS v3.1 Calculator"),
+                info_card("Finding Info", ft.Column([calc_asset_dropdown, calc_asset_custom, calc_title], spacing=10)),
+                info_card(
+                    "Base Metrics",
+                    ft.Row(
+                        controls=list(metric_dropdowns.values()),
+                        wrap=True,
+                        spacing=12,
+                        run_spacing=12,
+                    ),
+                ),
                 ft.Row(
-                    controls=list(metric_dropdowns.values()),
-                    wrap=True,
+                    [
+                        ft.ElevatedButton("Calculate", on_click=lambda e: do_calculate(save=False)),
+                        ft.OutlinedButton("Calculate & Save", on_click=lambda e: do_calculate(save=True)),
+                    ],
                     spacing=12,
-                    run_spacing=12,
                 ),
-            ),
-            ft.Row(
-                [
-                    ft.ElevatedButton("Calculate", on_click=lambda e: do_calculate(save=False)),
-                    ft.OutlinedButton("Calculate & Save", on_click=lambda e: do_calculate(save=True)),
-                ],
-                spacing=12,
-            ),
-            info_card("Result", ft.Column([calc_result_line, calc_details], spacing=10)),
-            ft.Text(
-                "Tip: Link findings to assets by using the exact same asset name in Assets tab.",
-                opacity=0.7,
-            ),
-        ],
-        spacing=16,
-        scroll=ft.ScrollMode.AUTO,
-    )
+                info_card("Result", ft.Column([calc_result_line, calc_details], spacing=10)),
+                ft.Text(
+                    "Tip: Link findings to assets by using the exact same asset name in Assets tab.",
+                    opacity=0.7,
+                ),
+            ],
+            spacing=16,
+            scroll=ft.ScrollMode.AUTO,
+        )
 
     import_format = ft.RadioGroup(
         content=ft.Row(
@@ -374,6 +457,11 @@ def main(page: ft.Page):
         value="csv",
     )
 
+    import_sync = ft.Checkbox(
+        label="Sync: treat as a full rescan and remove findings of these assets it no longer lists",
+        value=False,
+    )
+
     import_text = ft.TextField(
         label="Paste CSV/JSON here (or load from file)",
         multiline=True,
@@ -381,119 +469,196 @@ def main(page: ft.Page):
         max_lines=18,
     )
     import_summary = ft.Column(spacing=6)
+    import_progress = ft.ProgressBar(value=0, visible=False)
+    import_status = ft.Text("", opacity=0.8)
+    import_button = ft.ElevatedButton("Import", on_click=lambda e: do_import())
+    cancel_button = ft.OutlinedButton("Cancel", visible=False, on_click=lambda e: cancel_import())
+
+    # While an import runs, store changes are merged into "pending" and the
+    # UI is refreshed at most every IMPORT_UI_INTERVAL seconds.
+    import_state = {"running": False, "cancel": None, "pending": None, "last_flush": 0.0}
+
+    import_file_ctx = {"path": None}
+    import_file_label = ft.Text("", opacity=0.8, selectable=True)
 
-    file_picker = ft.FilePicker()
-    page.overlay.append(file_picker)
+    def set_import_file(path):
+        import_file_ctx["path"] = path
+        import_file_label.value = f"Selected file: {path}" if path else ""
 
     def on_file_result(e: ft.FilePickerResultEvent):
+        import importer
+
         if not e.files:
             return
-        try:
-            path = e.files[0].path
-            with open(path, "r", encoding="utf-8", errors="replace") as f:
-                import_text.value = f.read()
-            notify(f"Loaded: {path}", "success")
+        path = e.files[0].path
+        set_import_file(path)
+        import_format.value = importer.detect_format(path)
+        notify(f"Selected: {path}", "success")
+        page.update()
+
+    def set_import_running(running: bool):
+        import_state["running"] = running
+        import_button.disabled = running
+        cancel_button.visible = running
+        cancel_button.disabled = False
+        import_progress.visible = running
+        import_progress.value = 0 if running else None
+        if running:
+            import_status.value = "Starting import..."
+
+    def report_progress(summary):
+        now = time.perf_counter()
+        if now - import_state["last_flush"] < IMPORT_UI_INTERVAL:
+            return
+        import_progress.value = summary.read.fraction
+        import_status.value = (
+            f"{summary.imported:,} new, {summary.updated:,} updated, {summary.unchanged:,} unchanged, "
+            f"{summary.skipped:,} skipped — {summary.rows_per_sec:,.0f} rows/s"
+        )
+        flush_store_changes()
+
+    def cancel_import():
+        if import_state["cancel"] is not None:
+            import_state["cancel"].set()
+            cancel_button.disabled = True
+            import_status.value = "Cancelling after the current batch..."
             page.update()
+
+    def show_import_summary(summary, sync=False):
+        import_summary.controls = [
+            ft.Text(f"Imported: {summary.imported}", weight=ft.FontWeight.BOLD),
+            ft.Text(f"Already stored: {summary.updated} updated, {summary.unchanged} unchanged"),
+            ft.Text(f"Skipped invalid rows: {summary.skipped}"),
+            ft.Text(f"New assets: {summary.assets_created}"),
+            ft.Text(f"Throughput: {summary.rows_per_sec:,.0f} rows/s ({summary.seconds:.2f}s)", opacity=0.8),
+        ]
+        if sync:
+            import_summary.controls.insert(2, ft.Text(f"Removed (no longer in the scan): {summary.deleted}"))
+        if summary.cancelled:
+            import_summary.controls.insert(
+                0, ft.Text(
+                    "Cancelled: nothing was synced." if sync else "Cancelled: rows imported before the cancel were kept.",
+                    color=ft.colors.AMBER_300,
+                ),
+            )
+        for err in summary.errors[:5]:
+            import_summary.controls.append(ft.Text(f"Byte {err.offset}: {err.message}", opacity=0.75))
+        if len(summary.errors) > 5:
+            import_summary.controls.append(ft.Text(f"... and {len(summary.errors) - 5} more row errors", opacity=0.75))
+
+    def run_import(path, txt, mode, sync, cancel):
+        import importer
+
+        try:
+            # A selected file is streamed from disk and never copied into the text field.
+            if path:
+                summary = importer.import_file(
+                    store, path, fmt=mode, on_progress=report_progress, cancel=cancel, sync=sync,
+                )
+            else:
+                summary = importer.import_text(
+                    store, txt, fmt=mode, on_progress=report_progress, cancel=cancel, sync=sync,
+                )
         except Exception as ex:
-            notify(f"Failed reading file: {ex}", "error")
+            set_import_running(False)
+            import_status.value = ""
+            flush_store_changes()
+            notify(f"Import failed: {ex}", "error")
+            return
 
-    file_picker.on_result = on_file_result
+        if path and not summary.cancelled:
+            set_import_file(None)
+        set_import_running(False)
+        import_status.value = ""
+        show_import_summary(summary, sync)
+        flush_store_changes()
+        if summary.cancelled:
+            notify(f"Import cancelled: {summary.imported} added, {summary.skipped} skipped.", "warning")
+        else:
+            notify(
+                f"Import complete: {summary.imported} added, {summary.updated} updated, "
+                f"{summary.unchanged} unchanged, {summary.deleted} removed, {summary.skipped} skipped.",
+                "success",
+            )
 
     def do_import():
+        if import_state["running"]:
+            return
         txt = import_text.value or ""
         mode = import_format.value
-        if not txt.strip():
+        path = import_file_ctx["path"]
+        if not path and not txt.strip():
             notify("Paste some CSV/JSON first (or Load from file).", "warning")
             return
 
-        try:
-            parsed = parse_csv_text(txt) if mode == "csv" else parse_json_text(txt)
-            valid = 0
-            skipped = 0
-
-            for item in parsed:
-                metrics = {k: item[k] for k in METRIC_FIELDS}
-                try:
-                    res = calculate_base_score(metrics)
-                    vec = vector_string(metrics)
-                except Exception:
-                    skipped += 1
-                    continue
-
-                asset_name = (item.get("asset") or "").strip()
-                if asset_name:
-                    if store.get_asset_by_name(asset_name) is None:
-                        store.add_asset(name=asset_name, tags=[], services=[])
-
-                store.add_finding(
-                    asset_name=asset_name or "Unassigned",
-                    title=item["title"],
-                    metrics=metrics,
-                    score=res.score,
-                    severity=res.severity,
-                    vector=vec,
-                )
-                valid += 1
-
-            rebuild_all()
-            import_summary.controls = [
-                ft.Text(f"Imported: {valid}", weight=ft.FontWeight.BOLD),
-                ft.Text(f"Skipped invalid rows: {skipped}"),
-            ]
-            notify(f"Import complete: {valid} added, {skipped} skipped.", "success")
-            page.update()
-
-        except Exception as ex:
-            notify(f"Import failed: {ex}", "error")
+        import_state["cancel"] = threading.Event()
+        set_import_running(True)
+        page.update()
+        page.run_thread(run_import, path, txt, mode, bool(import_sync.value), import_state["cancel"])
 
-    import_view = ft.Column(
-        [
-            section_title("Import Findings"),
-            info_card(
-                "How to import",
-                ft.Column(
-                    [
-                        ft.Text("CSV header: asset,title,AV,AC,PR,UI,S,C,I,A", selectable=True),
-                        ft.Text('Example row: web-01,"XSS in search",N,L,N,R,U,L,L,N', selectable=True),
-                        ft.Text("JSON must be a list of objects with the same keys.", selectable=True),
-                    ],
-                    spacing=8,
+    def build_import_view():
+        return ft.Column(
+            [
+                section_title("Import Findings"),
+                info_card(
+                    "How to import",
+                    ft.Column(
+                        [
+                            ft.Text("CSV header: asset,title,AV,AC,PR,UI,S,C,I,A", selectable=True),
+                            ft.Text('Example row: web-01,"XSS in search",N,L,N,R,U,L,L,N', selectable=True),
+                            ft.Text("Or use a vector column instead: asset,title,vector", selectable=True),
+                            ft.Text("e.g. web-01,XSS in search,CVSS:3.1/AV:N/AC:L/PR:N/UI:R/S:U/C:L/I:L/A:N", selectable=True),
+                            ft.Text("JSON must be a list of objects with the same keys (or one object per line).", selectable=True),
+                        ],
+                        spacing=8,
+                    ),
                 ),
-            ),
-            info_card(
-                "Import Input",
-                ft.Column(
-                    [
-                        import_format,
-                        import_text,
-                        ft.Row(
-                            [
-                                ft.ElevatedButton(
-                                    "Load from file",
-                                    on_click=lambda e: file_picker.pick_files(
-                                        allow_multiple=False,
-                                        allowed_extensions=["csv", "json"],
+                info_card(
+                    "Import Input",
+                    ft.Column(
+                        [
+                            import_format,
+                            import_sync,
+                            import_text,
+                            ft.Row(
+                                [
+                                    ft.ElevatedButton(
+                                        "Load from file",
+                                        on_click=lambda e: picker("import", on_file_result).pick_files(
+                                            allow_multiple=False,
+                                            allowed_extensions=["csv", "json", "ndjson", "jsonl"],
+                                        ),
                                     ),
-                                ),
-                                ft.ElevatedButton("Import", on_click=lambda e: do_import()),
-                            ],
-                            spacing=12,
-                        ),
-                        import_summary,
-                    ],
-                    spacing=10,
+                                    import_button,
+                                    cancel_button,
+                                    ft.TextButton(
+                                        "Clear file",
+                                        on_click=lambda e: (set_import_file(None), page.update()),
+                                    ),
+                                ],
+                                spacing=12,
+                            ),
+                            import_file_label,
+                            import_progress,
+                            import_status,
+                            import_summary,
+                        ],
+                        spacing=10,
+                    ),
                 ),
-            ),
-        ],
-        spacing=16,
-        scroll=ft.ScrollMode.AUTO,
-    )
+            ],
+            spacing=16,
+            scroll=ft.ScrollMode.AUTO,
+        )
 
     asset_name = ft.TextField(label="Asset name", hint_text="e.g., api.example.com or 10.0.0.12")
     asset_tags = ft.TextField(label="Tags (comma-separated)", hint_text="internet-facing, prod, pci")
     asset_services = ft.TextField(label="Services (comma-separated)", hint_text="80/http, 443/https, 22/ssh")
 
-    assets_list = ft.Column(spacing=8, scroll=ft.ScrollMode.AUTO, height=420)
+    # Only the current page of each list is ever turned into controls.
+    list_state = {"page": 0, "size": 50, "sort": "recent", "detail_aid": None, "detail_page": 0}
+    assets_list = ft.ListView(spacing=8, height=420)
+    assets_page_label = ft.Text("", opacity=0.8)
     asset_detail_title = ft.Text("Select assets to view details.", size=16, weight=ft.FontWeight.BOLD)
     asset_detail_body = ft.Column(spacing=8)
 
@@ -507,8 +672,9 @@ def main(page: ft.Page):
 
         names = []
         for aid in selected_assets:
-            if aid in store.assets:
-                names.append(store.assets[aid].name)
+            a = store.get_asset(aid)
+            if a is not None:
+                names.append(a.name)
 
         if not names:
             notify("Selection contains no valid assets.", "warning")
@@ -516,81 +682,165 @@ def main(page: ft.Page):
 
         assets_export_ctx["asset_names"] = names
 
-        assets_export_picker.save_file(
+        picker("assets_export", on_assets_export_result).save_file(
             file_name="riskmapper_selected_assets_findings.csv",
-            allowed_extensions=["csv"],
+            allowed_extensions=["csv", "json", "ndjson"],
         )
 
+    # Rendered asset rows keyed by asset id, so changes can patch single rows.
+    asset_rows = {}
+    assets_placeholder = ft.Text("No assets yet. Add one using the form.", opacity=0.75)
+
+    def refresh_asset_row(aid: str):
+        row = asset_rows.get(aid)
+        a = store.get_asset(aid) if row is not None else None
+        if a is None:
+            return
+        risk = store.asset_risk(a.name)
+        count_txt, max_txt, avg_txt = row.data
+        count_txt.value = f"Findings: {risk.count}"
+        max_txt.value = f"Max: {risk.max_score:.1f}"
+        avg_txt.value = f"Avg: {risk.avg_score:.1f}"
+        row.bgcolor = ft.colors.with_opacity(0.14, ft.colors.BLUE) if aid in selected_assets else None
+
+    def toggle_asset(aid: str):
+        previous = last_selected_asset["id"]
+        if aid in selected_assets:
+            selected_assets.remove(aid)
+            if last_selected_asset["id"] == aid:
+                last_selected_asset["id"] = None
+        else:
+            selected_assets.add(aid)
+            last_selected_asset["id"] = aid # type: ignore
+
+        refresh_asset_row(aid)
+        if previous != last_selected_asset["id"]:
+            rebuild_asset_detail()
+        page.update()
+
+    def show_asset(a):
+        last_selected_asset["id"] = a.id if a is not None else None
+        rebuild_asset_detail()
+
+    def mk_row(a):
+        aid = a.id
+        stats = (ft.Text("", width=110), ft.Text("", width=90), ft.Text("", width=90))
+
+        row = ft.Container(
+            content=ft.Row(
+                [
+                    ft.Text(a.name, width=260, weight=ft.FontWeight.BOLD),
+                    *stats,
+                    ft.IconButton(icon=ft.icons.CHEVRON_RIGHT, on_click=lambda e: toggle_asset(aid)),
+                ],
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+            ),
+            on_click=lambda e: toggle_asset(aid),
+            ink=True,
+            padding=10,
+            border=ft.border.all(1, ft.colors.with_opacity(0.12, ft.colors.WHITE)),
+            border_radius=14,
+            data=stats,
+        )
+        asset_rows[aid] = row
+        refresh_asset_row(aid)
+        return row
+
+    def page_count(total: int) -> int:
+        return max(1, -(-total // list_state["size"]))
+
     def rebuild_assets_list():
+        if 3 not in startup_state["built"]:
+            return
         assets_list.controls.clear()
+        asset_rows.clear()
 
-        if not store.assets:
-            assets_list.controls.append(ft.Text("No assets yet. Add one using the form.", opacity=0.75))
+        total = store.asset_count()
+        pages = page_count(total)
+        list_state["page"] = min(list_state["page"], pages - 1)
+        assets_page_label.value = f"Page {list_state['page'] + 1} of {pages} ({total} assets)"
+
+        if not total:
+            assets_list.controls.append(assets_placeholder)
+            update_asset_dropdown()
             page.update()
             return
 
-        def mk_row(aid: str):
-            a = store.assets[aid]
-            findings = store.findings_for_asset_name(a.name)
-            if findings:
-                max_score = max(f.score for f in findings)
-                avg_score = sum(f.score for f in findings) / len(findings)
-            else:
-                max_score = 0.0
-                avg_score = 0.0
-
-            def on_toggle(e):
-                if aid in selected_assets:
-                    selected_assets.remove(aid)
-                    if last_selected_asset["id"] == aid:
-                        last_selected_asset["id"] = None
-                else:
-                    selected_assets.add(aid)
-                    last_selected_asset["id"] = aid # type: ignore
+        size = list_state["size"]
+        for a in store.assets_page(list_state["page"] * size, size, sort=list_state["sort"]):
+            assets_list.controls.append(mk_row(a))
 
-                rebuild_assets_list()
-                rebuild_asset_detail()
-                page.update()
+        update_asset_dropdown()
+        page.update()
 
-            is_selected = (aid in selected_assets)
+    def patch_assets_list(change: StoreChange):
+        for aid in change.removed_assets:
+            selected_assets.discard(aid)
 
-            return ft.Container(
-                content=ft.Row(
-                    [
-                        ft.Text(a.name, width=260, weight=ft.FontWeight.BOLD),
-                        ft.Text(f"Findings: {len(findings)}", width=110),
-                        ft.Text(f"Max: {max_score:.1f}", width=90),
-                        ft.Text(f"Avg: {avg_score:.1f}", width=90),
-                        ft.IconButton(icon=ft.icons.CHEVRON_RIGHT, on_click=on_toggle),
-                    ],
-                    alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                ),
-                on_click=on_toggle,
-                ink=True,
-                bgcolor=ft.colors.with_opacity(0.14, ft.colors.BLUE) if is_selected else None,
-                padding=10,
-                border=ft.border.all(1, ft.colors.with_opacity(0.12, ft.colors.WHITE)),
-                border_radius=14,
-            )
+        # Membership or order of the visible page may have changed: re-render
+        # just that page. Otherwise only refresh the visible touched rows.
+        if change.added_assets or change.removed_assets or (
+            list_state["sort"] == "score" and change.touched_assets
+        ):
+            rebuild_assets_list()
+            return
 
-        for aid in list(store.assets.keys())[::-1]:
-            assets_list.controls.append(mk_row(aid))
+        for aid in list(asset_rows):
+            a = store.get_asset(aid)
+            if a is not None and name_key(a.name) in change.touched_assets:
+                refresh_asset_row(aid)
+
+    def go_assets_page(delta: int):
+        pages = page_count(store.asset_count())
+        new_page = min(max(list_state["page"] + delta, 0), pages - 1)
+        if new_page != list_state["page"]:
+            list_state["page"] = new_page
+            rebuild_assets_list()
+
+    def on_sort_change(e):
+        list_state["sort"] = asset_sort.value or "recent"
+        list_state["page"] = 0
+        rebuild_assets_list()
 
-        update_asset_dropdown()
-        page.update()
+    def on_page_size_change(e):
+        list_state["size"] = int(page_size_dd.value or 50)
+        list_state["page"] = 0
+        list_state["detail_page"] = 0
+        rebuild_assets_list()
+        rebuild_asset_detail()
+
+    asset_sort = ft.Dropdown(
+        label="Sort by",
+        options=[ft.dropdown.Option(key, text=label) for key, label in ASSET_SORTS],
+        value="recent",
+        width=170,
+        on_change=on_sort_change,
+    )
+    page_size_dd = ft.Dropdown(
+        label="Page size",
+        options=[ft.dropdown.Option(str(n)) for n in PAGE_SIZES],
+        value=str(list_state["size"]),
+        width=120,
+        on_change=on_page_size_change,
+    )
 
     def clear_selection(e):
+        selected = list(selected_assets)
         selected_assets.clear()
         last_selected_asset["id"] = None
-        rebuild_assets_list()
+        for aid in selected:
+            refresh_asset_row(aid)
         rebuild_asset_detail()
         page.update()
 
     def rebuild_asset_detail():
+        if 3 not in startup_state["built"]:
+            return
         aid = last_selected_asset["id"]
         asset_detail_body.controls.clear()
 
-        if not aid or aid not in store.assets:
+        a = store.get_asset(aid) if aid else None
+        if a is None:
             asset_detail_title.value = (
                 "Select assets (multi-select is allowed). "
                 "Details shows the last clicked asset."
@@ -598,26 +848,25 @@ def main(page: ft.Page):
             page.update()
             return
 
-        a = store.assets[aid]
         asset_detail_title.value = f"Asset (last selected): {a.name}"
 
-        findings = store.findings_for_asset_name(a.name)
-        if findings:
-            max_score = max(f.score for f in findings)
-            avg_score = sum(f.score for f in findings) / len(findings)
-        else:
-            max_score = 0.0
-            avg_score = 0.0
+        risk = store.asset_risk(a.name)
+        counts = risk.counts
 
-        counts = {"Critical": 0, "High": 0, "Medium": 0, "Low": 0, "None": 0}
-        for f in findings:
-            counts[f.severity] = counts.get(f.severity, 0) + 1
+        if list_state["detail_aid"] != aid:
+            list_state["detail_aid"] = aid
+            list_state["detail_page"] = 0
+        size = list_state["size"]
+        pages = page_count(risk.count)
+        list_state["detail_page"] = min(list_state["detail_page"], pages - 1)
+        offset = list_state["detail_page"] * size
+        findings = store.findings_page(a.name, offset, size)
 
-        finding_cards = ft.Column(spacing=8)
+        finding_cards = ft.ListView(spacing=8, height=480)
         if not findings:
             finding_cards.controls.append(ft.Text("No findings mapped to this asset yet.", opacity=0.75))
         else:
-            for f in sorted(findings, key=lambda x: x.score, reverse=True):
+            for f in findings:
                 try:
                     res = calculate_base_score(f.metrics)
                     impact_txt = f"I:{res.impact:.1f}"
@@ -639,7 +888,7 @@ def main(page: ft.Page):
                                         ft.IconButton(
                                             icon=ft.icons.DELETE_OUTLINE,
                                             tooltip="Delete finding",
-                                            on_click=lambda e, fid=f.id: (store.delete_finding(fid), rebuild_all()),
+                                            on_click=lambda e, fid=f.id: store.delete_finding(fid),
                                         ),
                                     ],
                                     alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
@@ -665,13 +914,9 @@ def main(page: ft.Page):
                 )
 
         def delete_asset():
-            if aid in selected_assets:
-                selected_assets.remove(aid)
-            last_selected_asset["id"] = None
-
+            # The store change event drops the row, the selection and this panel.
             store.delete_asset(aid)
-            rebuild_all()
-            notify("Asset deleted.", "success")
+            notify(f"Asset deleted with its {risk.count} finding(s).", "success")
 
         asset_detail_body.controls.extend(
             [
@@ -689,9 +934,9 @@ def main(page: ft.Page):
                     "Risk Summary",
                     ft.Column(
                         [
-                            ft.Text(f"Findings: {len(findings)}"),
-                            ft.Text(f"Max score: {max_score:.1f}"),
-                            ft.Text(f"Avg score: {avg_score:.1f}"),
+                            ft.Text(f"Findings: {risk.count}"),
+                            ft.Text(f"Max score: {risk.max_score:.1f}"),
+                            ft.Text(f"Avg score: {risk.avg_score:.1f}"),
                             ft.Row(
                                 [
                                     ft.Column([ft.Text("Critical"), ft.Text(str(counts["Critical"]))]),
@@ -728,17 +973,45 @@ def main(page: ft.Page):
                         spacing=8,
                     ),
                 ),
-                info_card("Findings (sorted by score)", finding_cards),
+                info_card(
+                    "Findings (sorted by score)",
+                    ft.Column(
+                        [
+                            finding_cards,
+                            pager(
+                                ft.Text(
+                                    f"{offset + 1}–{offset + len(findings)} of {risk.count}" if findings else "0 of 0",
+                                    opacity=0.8,
+                                ),
+                                lambda e: go_detail_page(-1),
+                                lambda e: go_detail_page(1),
+                            ),
+                        ],
+                        spacing=8,
+                    ),
+                ),
             ]
         )
         page.update()
 
 
+    def go_detail_page(delta: int):
+        aid = last_selected_asset["id"]
+        a = store.get_asset(aid) if aid else None
+        if a is None:
+            return
+        pages = page_count(store.asset_risk(a.name).count)
+        new_page = min(max(list_state["detail_page"] + delta, 0), pages - 1)
+        if new_page != list_state["detail_page"]:
+            list_state["detail_page"] = new_page
+            rebuild_asset_detail()
+
     def update_asset_dropdown():
+        if 1 not in startup_state["built"]:
+            return
         current = getattr(calc_asset_dropdown, "value", None)
-        opts = [ft.dropdown.Option(a.name, text=a.name) for a in store.assets.values()]
-        calc_asset_dropdown.options = opts
-        names = [a.name for a in store.assets.values()]
+        names = store.asset_names()
+        calc_asset_dropdown.options = [ft.dropdown.Option(n, text=n) for n in names]
         if current and current in names:
             calc_asset_dropdown.value = current
         else:
@@ -758,74 +1031,165 @@ def main(page: ft.Page):
         asset_tags.value = ""
         asset_services.value = ""
 
-        rebuild_assets_list()
         notify("Asset added.", "success")
         page.update()
 
-    assets_view = ft.Column(
-        [
-            section_title("Attack Surface / Assets"),
-            ft.ResponsiveRow(
-                [
-                    ft.Container(
-                        col=5,
-                        content=info_card(
-                            "Add Asset",
-                            ft.Column(
-                                [
-                                    asset_name,
-                                    asset_tags,
-                                    asset_services,
-                                    ft.ElevatedButton("Add Asset", on_click=add_asset_action),
-                                    ft.Row(
-                                        [
-                                            ft.ElevatedButton(
-                                                "Export selected assets to CSV",
-                                                icon=ft.icons.DOWNLOAD,
-                                                on_click=lambda e: export_selected_assets(),
-                                            ),
-                                            ft.OutlinedButton(
-                                                "Clear selection",
-                                                icon=ft.icons.CLEAR,
-                                                on_click=clear_selection,
-                                            ),
-                                        ],
-                                        wrap=True,
-                                        spacing=10,
-                                    ),
-                                ],
-                                spacing=10,
+    def build_assets_view():
+        return ft.Column(
+            [
+                section_title("Attack Surface / Assets"),
+                ft.ResponsiveRow(
+                    [
+                        ft.Container(
+                            col=5,
+                            content=info_card(
+                                "Add Asset",
+                                ft.Column(
+                                    [
+                                        asset_name,
+                                        asset_tags,
+                                        asset_services,
+                                        ft.ElevatedButton("Add Asset", on_click=add_asset_action),
+                                        ft.Row(
+                                            [
+                                                ft.ElevatedButton(
+                                                    "Export selected assets to CSV",
+                                                    icon=ft.icons.DOWNLOAD,
+                                                    on_click=lambda e: export_selected_assets(),
+                                                ),
+                                                ft.OutlinedButton(
+                                                    "Clear selection",
+                                                    icon=ft.icons.CLEAR,
+                                                    on_click=clear_selection,
+                                                ),
+                                            ],
+                                            wrap=True,
+                                            spacing=10,
+                                        ),
+                                    ],
+                                    spacing=10,
+                                ),
                             ),
                         ),
-                    ),
-                    ft.Container(col=7, content=info_card("Assets (click row to toggle select)", assets_list)),
-                ]
+                        ft.Container(
+                            col=7,
+                            content=info_card(
+                                "Assets (click row to toggle select)",
+                                ft.Column(
+                                    [
+                                        ft.Row([asset_sort, page_size_dd], spacing=10),
+                                        assets_list,
+                                        pager(
+                                            assets_page_label,
+                                            lambda e: go_assets_page(-1),
+                                            lambda e: go_assets_page(1),
+                                        ),
+                                    ],
+                                    spacing=8,
+                                ),
+                            ),
+                        ),
+                    ]
+                ),
+                info_card("Asset Details (last selected)", ft.Column([asset_detail_title, asset_detail_body], spacing=12)),
+            ],
+            spacing=16,
+            scroll=ft.ScrollMode.AUTO,
+        )
+
+    def loading_view():
+        return ft.Container(
+            ft.Column(
+                [ft.ProgressRing(), ft.Text("Loading findings...", opacity=0.8)],
+                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
             ),
-            info_card("Asset Details (last selected)", ft.Column([asset_detail_title, asset_detail_body], spacing=12)),
-        ],
-        spacing=16,
-        scroll=ft.ScrollMode.AUTO,
-    )
+            alignment=ft.alignment.center,
+            padding=40,
+        )
+
+    # Tabs other than the dashboard are built and filled on first visit.
+    tab_builders = {1: build_calculator_view, 2: build_import_view, 3: build_assets_view}
+    tab_hydrators = {1: [update_asset_dropdown], 3: [rebuild_assets_list, rebuild_asset_detail]}
+
+    def show_tab(i: int):
+        if i in startup_state["built"] or not startup_state["ready"]:
+            return
+        tabs.tabs[i].content = tab_builders[i]()
+        startup_state["built"].add(i)
+        for hydrate in tab_hydrators.get(i, []):
+            hydrate()
+
+    def on_tab_change(e):
+        show_tab(tabs.selected_index)
+        page.update()
 
     def rebuild_all():
         rebuild_dashboard()
+        update_asset_dropdown()
         rebuild_assets_list()
         rebuild_asset_detail()
+        show_tab(tabs.selected_index)
+        page.update()
+
+    def apply_store_change(change: StoreChange):
+        if change.reload:
+            startup_state["ready"] = True
+            rebuild_all()
+            return
+
+        refresh_counts()
+        if change.added_findings or change.removed_findings or change.updated_findings:
+            rebuild_latest()
+            rebuild_search()
+        patch_assets_list(change)
+
+        aid = last_selected_asset["id"]
+        if aid in change.removed_assets:
+            last_selected_asset["id"] = None
+            rebuild_asset_detail()
+        elif aid:
+            a = store.get_asset(aid)
+            if a is not None and name_key(a.name) in change.touched_assets:
+                rebuild_asset_detail()
+        page.update()
+
+    def flush_store_changes():
+        change = import_state["pending"]
+        import_state["pending"] = None
+        import_state["last_flush"] = time.perf_counter()
+        if change is not None:
+            apply_store_change(change)
+        else:
+            page.update()
+
+    def on_store_change(change: StoreChange):
+        if not import_state["running"]:
+            apply_store_change(change)
+            return
+        if import_state["pending"] is None:
+            import_state["pending"] = change
+        else:
+            import_state["pending"].merge(change)
+
+    store.subscribe(on_store_change)
 
     tabs = ft.Tabs(
         selected_index=0,
         animation_duration=250,
         tabs=[
             ft.Tab(text="Dashboard", content=dashboard_view),
-            ft.Tab(text="Calculator", content=calculator_view),
-            ft.Tab(text="Import", content=import_view),
-            ft.Tab(text="Assets", content=assets_view),
+            ft.Tab(text="Calculator", content=loading_view()),
+            ft.Tab(text="Import", content=loading_view()),
+            ft.Tab(text="Assets", content=loading_view()),
         ],
         expand=1,
+        on_change=on_tab_change,
     )
 
+    rebuild_dashboard()
     page.add(tabs)
-    rebuild_all()
+    page.run_thread(store.load_from_db)
 
 
-ft.app(target=main)
+if __name__ == "__main__":
+    ft.app(target=main)
@@ -1,17 +1,45 @@
+import codecs
 import csv
+import io
 import json
-from typing import List, Dict, Any
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from cvss import METRIC_FIELDS, metrics_from_vector
 
 REQUIRED = ["asset", "title", "AV", "AC", "PR", "UI", "S", "C", "I", "A"]
+VECTOR_FIELD = "vector"
 
 def _clean(s: Any) -> str:
     return ("" if s is None else str(s)).strip()
 
-def parse_csv_text(csv_text: str) -> List[Dict[str, str]]:
-    lines = csv_text.splitlines()
-    if not lines:
-        return []
+def _normalize(row: Dict[str, Any]) -> Dict[str, str]:
+    item = {k: _clean(row.get(k)) for k in REQUIRED}
+    if not item["asset"]:
+        item["asset"] = "Unassigned"
+    if not item["title"]:
+        item["title"] = "Untitled Finding"
+
+    # A `vector` column can stand in for the eight metric columns.
+    vector = _clean(row.get(VECTOR_FIELD))
+    if vector and not any(item[k] for k in METRIC_FIELDS):
+        try:
+            item.update(metrics_from_vector(vector))
+        except ValueError:
+            pass  # metrics stay empty, so scoring reports the row as invalid
+        return item
 
+    # Uppercase metric codes
+    for k in METRIC_FIELDS:
+        item[k] = item[k].upper()
+    return item
+
+SNIFF_BYTES = 64 * 1024
+CHUNK_SIZE = 5000
+
+def _sniff_delimiter(lines: List[str]) -> str:
     delimiter = ","
     sample = "\n".join(lines[:5])
     try:
@@ -21,36 +49,286 @@ def parse_csv_text(csv_text: str) -> List[Dict[str, str]]:
         header = lines[0]
         if ";" in header and (header.count(";") >= header.count(",")):
             delimiter = ";"
+    return delimiter
+
+def parse_csv_text(csv_text: str) -> List[Dict[str, str]]:
+    lines = csv_text.splitlines()
+    if not lines:
+        return []
+
+    reader = csv.DictReader(lines, delimiter=_sniff_delimiter(lines))
+    return [_normalize(row) for row in reader]
+
+def _chunks(rows: Iterable[Dict[str, str]], chunk_size: int) -> Iterator[List[Dict[str, str]]]:
+    chunk: List[Dict[str, str]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+@dataclass
+class ReadProgress:
+    """How far a streaming reader has got, updated before each chunk."""
+    total: int = 0  # bytes for files (rows for pasted text)
+    done: int = 0
+
+    @property
+    def fraction(self) -> float:
+        return min(self.done / self.total, 1.0) if self.total else 0.0
+
+def _tracked(chunks: Iterator[List[Dict[str, str]]], f, progress: Optional[ReadProgress]) -> Iterator[List[Dict[str, str]]]:
+    if progress is None:
+        yield from chunks
+        return
+    progress.total = os.fstat(f.fileno()).st_size
+    for chunk in chunks:
+        progress.done = f.tell()  # read-ahead position, close enough for a progress bar
+        yield chunk
+    progress.done = progress.total
 
-    reader = csv.DictReader(lines, delimiter=delimiter)
-    findings: List[Dict[str, str]] = []
-    for row in reader:
-        item = {k: _clean(row.get(k)) for k in REQUIRED}
-        if not item["asset"]:
-            item["asset"] = "Unassigned"
-        if not item["title"]:
-            item["title"] = "Untitled Finding"
-        # Uppercase metric codes
-        for k in ["AV", "AC", "PR", "UI", "S", "C", "I", "A"]:
-            item[k] = item[k].upper()
-        findings.append(item)
-    return findings
+def iter_csv_file(
+    path: str,
+    chunk_size: int = CHUNK_SIZE,
+    progress: Optional[ReadProgress] = None,
+) -> Iterator[List[Dict[str, str]]]:
+    """Stream a CSV file as lists of at most `chunk_size` normalized rows.
+
+    The delimiter is sniffed from the first SNIFF_BYTES; the rest of the file
+    is read incrementally, so memory stays bounded by the chunk size.
+    """
+    with open(path, "r", encoding="utf-8-sig", errors="replace", newline="") as f:
+        lines = f.read(SNIFF_BYTES).splitlines()
+        if not lines:
+            return
+        delimiter = _sniff_delimiter(lines)
+        f.seek(0)
+        reader = csv.DictReader(f, delimiter=delimiter)
+        yield from _tracked(_chunks((_normalize(row) for row in reader), chunk_size), f.buffer, progress)
 
 def parse_json_text(json_text: str) -> List[Dict[str, str]]:
     data = json.loads(json_text)
     if not isinstance(data, list):
         raise ValueError("JSON must be a list of objects.")
 
-    findings: List[Dict[str, str]] = []
-    for obj in data:
-        if not isinstance(obj, dict):
+    return [_normalize(obj) for obj in data if isinstance(obj, dict)]
+
+@dataclass
+class RowError:
+    offset: int  # byte offset of the offending row in the file
+    message: str
+
+READ_BYTES = 1024 * 1024
+
+# Tokens that matter when looking for the end of one array element: complete
+# strings (so brackets inside them are ignored), a lone quote (string cut off
+# by the read buffer) and brackets.
+_ELEMENT_TOKENS = re.compile(r'"(?:[^"\\]|\\.)*"|"|[\[\]{}]')
+_SCALAR_END = re.compile(r"[,\]\s]")
+_WS = re.compile(r"\s*")
+
+def _element_end(buf: str, pos: int) -> Optional[int]:
+    """End index of the JSON value starting at buf[pos], or None if the
+    buffer does not hold all of it yet."""
+    first = buf[pos]
+    if first not in "[{\"":
+        m = _SCALAR_END.search(buf, pos)
+        return m.start() if m else None
+
+    depth = 0
+    for m in _ELEMENT_TOKENS.finditer(buf, pos):
+        tok = m.group()
+        if tok == '"':
+            return None
+        if tok[0] == '"':
+            if depth == 0:
+                return m.end()
+            continue
+        depth += 1 if tok in "[{" else -1
+        if depth == 0:
+            return m.end()
+    return None
+
+def _iter_json_array(f, start: int, errors: Optional[List[RowError]]) -> Iterator[Dict[str, Any]]:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buf = ""
+    base = start  # byte offset of buf[0]
+    pos = 0
+    eof = False
+
+    def offset(i: int) -> int:
+        return base + len(buf[:i].encode("utf-8"))
+
+    def fill() -> bool:
+        # Drop the consumed prefix and append the next block; False at EOF.
+        nonlocal buf, base, pos, eof
+        if eof:
+            return False
+        base += len(buf[:pos].encode("utf-8"))
+        buf = buf[pos:]
+        pos = 0
+        block = f.read(READ_BYTES)
+        eof = not block
+        buf += decoder.decode(block, final=eof)
+        return True
+
+    def skip_ws() -> bool:
+        nonlocal pos
+        while True:
+            pos = _WS.match(buf, pos).end()
+            if pos < len(buf):
+                return True
+            if not fill():
+                return False
+
+    if not skip_ws() or buf[pos] != "[":
+        raise ValueError("JSON must be a list of objects.")
+    pos += 1
+    if not skip_ws():
+        raise ValueError("JSON array is not closed.")
+    if buf[pos] == "]":
+        return
+
+    while True:
+        end = _element_end(buf, pos)
+        while end is None:
+            if not fill():
+                raise ValueError(f"Unexpected end of JSON at byte {offset(pos)}")
+            end = _element_end(buf, pos)
+
+        try:
+            obj = json.loads(buf[pos:end])
+        except ValueError as ex:
+            if errors is not None:
+                errors.append(RowError(offset(pos), f"Invalid JSON: {ex}"))
+        else:
+            if isinstance(obj, dict):
+                yield obj
+            elif errors is not None:
+                errors.append(RowError(offset(pos), "Expected a JSON object."))
+
+        pos = end
+        if not skip_ws():
+            raise ValueError("JSON array is not closed.")
+        if buf[pos] == "]":
+            return
+        if buf[pos] != ",":
+            raise ValueError(f"Expected ',' or ']' at byte {offset(pos)}")
+        pos += 1
+        if not skip_ws():
+            raise ValueError("JSON array is not closed.")
+
+def _iter_ndjson(f, start: int, errors: Optional[List[RowError]]) -> Iterator[Dict[str, Any]]:
+    pos = start
+    for line in f:
+        line_start = pos
+        pos += len(line)
+        text = line.decode("utf-8", errors="replace").strip()
+        if not text:
+            continue
+        try:
+            obj = json.loads(text)
+        except ValueError as ex:
+            if errors is not None:
+                errors.append(RowError(line_start, f"Invalid JSON: {ex}"))
             continue
-        item = {k: _clean(obj.get(k)) for k in REQUIRED}
-        if not item["asset"]:
-            item["asset"] = "Unassigned"
-        if not item["title"]:
-            item["title"] = "Untitled Finding"
-        for k in ["AV", "AC", "PR", "UI", "S", "C", "I", "A"]:
-            item[k] = item[k].upper()
-        findings.append(item)
-    return findings
+        if isinstance(obj, dict):
+            yield obj
+        elif errors is not None:
+            errors.append(RowError(line_start, "Expected a JSON object."))
+
+def iter_json_file(
+    path: str,
+    chunk_size: int = CHUNK_SIZE,
+    errors: Optional[List[RowError]] = None,
+    progress: Optional[ReadProgress] = None,
+) -> Iterator[List[Dict[str, str]]]:
+    """Stream a JSON array or NDJSON file as chunks of normalized rows.
+
+    The format is picked from the first non-blank byte ('[' = array, anything
+    else = one object per line). Rows that fail to parse or are not objects
+    are skipped and, if `errors` is given, appended to it with their byte
+    offset. Structural errors in an array still raise ValueError.
+    """
+    start, is_array = json_layout(path)
+    with open(path, "rb") as f:
+        f.seek(start)
+        rows = _iter_json_array(f, start, errors) if is_array else _iter_ndjson(f, start, errors)
+        yield from _tracked(_chunks((_normalize(obj) for obj in rows), chunk_size), f, progress)
+
+# Byte-range sharding, used by the multi-process import (pipeline.py). Ranges
+# always end on a line break, so each one can be parsed on its own.
+
+def _split_point(block: bytes, quoted: bool) -> Optional[int]:
+    # Last line break in `block` that is not inside a double-quoted CSV field.
+    # Escaped quotes ("") come in pairs, so quote parity is enough.
+    nl = block.rfind(b"\n")
+    while quoted and nl >= 0 and block.count(b'"', 0, nl) % 2:
+        nl = block.rfind(b"\n", 0, nl)
+    return nl + 1 if nl >= 0 else None
+
+def iter_byte_ranges(path: str, start: int, chunk_bytes: int, quoted: bool = False) -> Iterator[Tuple[int, int]]:
+    """Split bytes [start, EOF) of a file into (start, end) ranges of about
+    `chunk_bytes`, each ending on a line break. With `quoted`, line breaks
+    inside quoted CSV fields are not used as split points."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        pos = start
+        while pos < size:
+            f.seek(pos)
+            block = f.read(chunk_bytes)
+            end = None
+            while pos + len(block) < size:
+                end = _split_point(block, quoted)
+                if end is not None:
+                    break
+                block += f.read(chunk_bytes)  # one row longer than a chunk
+            end = pos + end if end is not None else size
+            yield pos, end
+            pos = end
+
+@dataclass
+class CsvLayout:
+    data_start: int  # byte offset of the first row after the header
+    fieldnames: List[str]
+    delimiter: str
+
+def csv_layout(path: str) -> Optional[CsvLayout]:
+    """Header, delimiter and data offset of a CSV file (None if it is empty)."""
+    with open(path, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+    start = len(codecs.BOM_UTF8) if head.startswith(codecs.BOM_UTF8) else 0
+    text = head[start:].decode("utf-8", errors="replace")
+    lines = text.splitlines()
+    if not lines:
+        return None
+    delimiter = _sniff_delimiter(lines)
+    fieldnames = next(csv.reader(io.StringIO(text, newline=""), delimiter=delimiter))
+
+    body = head[start:]
+    nl = body.find(b"\n")
+    while nl >= 0 and body.count(b'"', 0, nl) % 2:
+        nl = body.find(b"\n", nl + 1)
+    return CsvLayout(start + nl + 1 if nl >= 0 else len(head), fieldnames, delimiter)
+
+def parse_csv_range(path: str, start: int, end: int, fieldnames: List[str], delimiter: str) -> List[Dict[str, str]]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8", errors="replace")
+    reader = csv.DictReader(io.StringIO(text, newline=""), fieldnames=fieldnames, delimiter=delimiter)
+    return [_normalize(row) for row in reader]
+
+def parse_ndjson_range(path: str, start: int, end: int, errors: Optional[List[RowError]] = None) -> List[Dict[str, str]]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        block = io.BytesIO(f.read(end - start))
+    return [_normalize(obj) for obj in _iter_ndjson(block, start, errors)]
+
+def json_layout(path: str) -> Tuple[int, bool]:
+    """(data offset after any BOM, True for a JSON array / False for NDJSON)."""
+    with open(path, "rb") as f:
+        start = len(codecs.BOM_UTF8) if f.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8 else 0
+        f.seek(start)
+        return start, f.read(4096).lstrip().startswith(b"[")
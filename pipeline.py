@@ -0,0 +1,113 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from cvss import calculate_base_scores
+from importer import ImportSummary, detect_format, finding_item, import_file
+from parser import (
+    CHUNK_SIZE,
+    RowError,
+    csv_layout,
+    iter_byte_ranges,
+    json_layout,
+    parse_csv_range,
+    parse_ndjson_range,
+)
+from storage import Store
+
+# Bytes of input per worker task. Larger shards mean fewer round trips and
+# bigger write transactions; smaller ones spread modest files over more cores.
+CHUNK_BYTES = 4 * 1024 * 1024
+
+# What a worker sends back: rows parsed, (asset, title, metric code) for the
+# rows that scored, and row errors with absolute byte offsets.
+Batch = Tuple[int, List[Tuple[str, str, int]], List[RowError]]
+
+def _score(rows: List[Dict[str, str]], errors: List[RowError]) -> Batch:
+    codes = calculate_base_scores(rows).codes
+    return len(rows), [(r["asset"], r["title"], c) for r, c in zip(rows, codes) if c >= 0], errors
+
+def _csv_task(path: str, start: int, end: int, fieldnames: List[str], delimiter: str) -> Batch:
+    return _score(parse_csv_range(path, start, end, fieldnames, delimiter), [])
+
+def _ndjson_task(path: str, start: int, end: int) -> Batch:
+    errors: List[RowError] = []
+    return _score(parse_ndjson_range(path, start, end, errors), errors)
+
+def _tasks(
+    path: str,
+    fmt: str,
+    chunk_bytes: int,
+) -> Iterator[Tuple[Callable[..., Batch], Tuple[Any, ...]]]:
+    """(worker function, args) for each shard of the file, in file order."""
+    if fmt == "csv":
+        layout = csv_layout(path)
+        if layout is None:
+            return
+        for start, end in iter_byte_ranges(path, layout.data_start, chunk_bytes, quoted=True):
+            yield _csv_task, (path, start, end, layout.fieldnames, layout.delimiter)
+        return
+
+    start, _ = json_layout(path)
+    for s, e in iter_byte_ranges(path, start, chunk_bytes):
+        yield _ndjson_task, (path, s, e)
+
+def import_file_parallel(
+    store: Store,
+    path: str,
+    fmt: Optional[str] = None,
+    workers: Optional[int] = None,
+    chunk_bytes: int = CHUNK_BYTES,
+    chunk_size: int = CHUNK_SIZE,
+) -> ImportSummary:
+    """Import a file with parsing and scoring spread over `workers` processes.
+
+    CSV and NDJSON files are sharded by byte range on line boundaries. This
+    process is the only writer: scored batches are added to the store one
+    shard at a time, in file order. With workers=1, files under two chunks,
+    or JSON arrays (no cheap split points, and shipping parsed rows to a
+    worker costs more than scoring them here), this is plain
+    importer.import_file().
+    """
+    workers = workers or os.cpu_count() or 1
+    fmt = fmt or detect_format(path)
+    if (
+        workers <= 1
+        or os.path.getsize(path) < 2 * chunk_bytes
+        or (fmt == "json" and json_layout(path)[1])
+    ):
+        return import_file(store, path, fmt, chunk_size)
+
+    started = time.perf_counter()
+    summary = ImportSummary()
+
+    def write(batch: Batch) -> None:
+        n, found, errors = batch
+        result = store.add_findings_bulk(finding_item(*f) for f in found)
+        summary.imported += result.inserted
+        summary.updated += result.updated
+        summary.unchanged += result.unchanged
+        summary.skipped += n - result.inserted - result.updated - result.unchanged
+        summary.assets_created += result.assets_created
+        summary.errors.extend(errors)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Future] = deque()
+        try:
+            for fn, args in _tasks(path, fmt, chunk_bytes):
+                pending.append(pool.submit(fn, *args))
+                # Bounded read-ahead keeps memory flat on very large files.
+                if len(pending) >= 2 * workers:
+                    write(pending.popleft().result())
+            while pending:
+                write(pending.popleft().result())
+        except BaseException:
+            for fut in pending:
+                fut.cancel()
+            raise
+
+    summary.skipped += len(summary.errors)
+    summary.seconds = time.perf_counter() - started
+    return summary
@@ -0,0 +1,152 @@
+"""Headless RiskMapper: import, rescore, export and risk reports as JSON, no GUI."""
+import argparse
+import json
+import sqlite3
+import sys
+from typing import Any, Dict, List, Optional
+
+import db
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2  # argparse's own exit code for bad arguments
+EXIT_PARTIAL = 3  # completed, but some rows were skipped
+
+def _print_json(data: Any) -> None:
+    json.dump(data, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+def cmd_import(args: argparse.Namespace) -> int:
+    import importer
+    import pipeline
+    from storage import SqlStore
+
+    store = SqlStore()
+    store.load_from_db()
+    results = []
+    code = EXIT_OK
+    for path in args.files:
+        if args.sync:
+            summary = importer.import_file(store, path, fmt=args.format, sync=True, scope=args.scope)
+        else:
+            summary = pipeline.import_file_parallel(
+                store, path, fmt=args.format, workers=args.workers,
+                chunk_bytes=args.chunk_bytes or pipeline.CHUNK_BYTES,
+            )
+        results.append({
+            "file": path,
+            "imported": summary.imported,
+            "updated": summary.updated,
+            "unchanged": summary.unchanged,
+            "deleted": summary.deleted,
+            "skipped": summary.skipped,
+            "assets_created": summary.assets_created,
+            "seconds": round(summary.seconds, 3),
+            "rows_per_sec": round(summary.rows_per_sec),
+            "errors": [{"offset": e.offset, "message": e.message} for e in summary.errors[:args.max_errors]],
+        })
+        if summary.skipped:
+            code = EXIT_PARTIAL
+    _print_json(results)
+    return code
+
+def cmd_rescore(args: argparse.Namespace) -> int:
+    from cvss import calculate_base_score, vector_string
+
+    checked = 0
+    invalid: List[Dict[str, str]] = []
+    updates = []
+    for f in db.iter_findings():
+        checked += 1
+        try:
+            res = calculate_base_score(f["metrics"])
+        except ValueError as e:
+            invalid.append({"id": f["id"], "message": str(e)})
+            continue
+        vector = vector_string(f["metrics"])
+        if (res.score, res.severity, vector) != (f["score"], f["severity"], f["vector"]):
+            updates.append((res.score, res.severity, vector, f["id"]))
+
+    if not args.dry_run and updates:
+        db.update_scores(updates)
+    _print_json({
+        "checked": checked,
+        "changed": len(updates),
+        "dry_run": args.dry_run,
+        "invalid": invalid[:args.max_errors],
+        "invalid_count": len(invalid),
+    })
+    return EXIT_PARTIAL if invalid else EXIT_OK
+
+def cmd_export(args: argparse.Namespace) -> int:
+    import exporter
+
+    if args.output:
+        n = exporter.export_file(args.output, args.format, args.asset)
+        _print_json({"file": args.output, "findings": n})
+    else:
+        exporter.write_export(sys.stdout, args.format or "csv", args.asset)
+    return EXIT_OK
+
+def cmd_risk(args: argparse.Namespace) -> int:
+    assets = db.risk_by_asset(args.asset)
+    missing = sorted({db.fold_name(n) for n in args.asset or []} - {db.fold_name(a["asset"]) for a in assets})
+    _print_json({"totals": db.severity_counts(), "assets": assets, "missing": missing})
+    return EXIT_ERROR if missing else EXIT_OK
+
+def cmd_search(args: argparse.Namespace) -> int:
+    total, rows = db.search_findings(" ".join(args.query), args.offset, args.limit)
+    _print_json({"total": total, "offset": args.offset, "findings": rows})
+    return EXIT_OK
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="riskmapper", description="RiskMapper command line")
+    ap.add_argument("--db", default=db.DB_PATH, help="SQLite database (default: %(default)s)")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import", help="import CSV/JSON/NDJSON findings files")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--format", choices=["csv", "json"], help="default: from the file extension")
+    p.add_argument("--max-errors", type=int, default=20, help="row errors to report per file")
+    p.add_argument("--workers", type=int, help="parse/score processes (default: CPU count, 1 = in-process)")
+    p.add_argument("--chunk-bytes", type=int, help="bytes of input per worker task (default: 4 MiB)")
+    p.add_argument("--sync", action="store_true", help="treat each file as a full rescan: also delete stored findings it no longer lists")
+    p.add_argument("--scope", action="append", metavar="ASSET", help="with --sync, the assets the scan covers (repeatable, default: those in the file)")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("rescore", help="recompute score, severity and vector from stored metrics")
+    p.add_argument("--dry-run", action="store_true")
+    p.add_argument("--max-errors", type=int, default=20)
+    p.set_defaults(func=cmd_rescore)
+
+    p = sub.add_parser("export", help="export findings, highest score first")
+    p.add_argument("--format", choices=["csv", "json", "ndjson"], help="default: from the -o extension, else csv")
+    p.add_argument("--asset", action="append", help="only this asset (repeatable)")
+    p.add_argument("-o", "--output", help="write to a file instead of stdout")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("risk", help="per-asset risk summary")
+    p.add_argument("--asset", action="append", help="only this asset (repeatable)")
+    p.set_defaults(func=cmd_risk)
+
+    p = sub.add_parser("search", help="full-text search over finding titles and asset names")
+    p.add_argument("query", nargs="+")
+    p.add_argument("--limit", type=int, default=20)
+    p.add_argument("--offset", type=int, default=0)
+    p.set_defaults(func=cmd_search)
+    return ap
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    db.DB_PATH = args.db
+    try:
+        db.init_db()
+        return args.func(args)
+    except (OSError, ValueError, RuntimeError, sqlite3.Error) as e:
+        print(f"riskmapper: error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    finally:
+        db.close_all()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""Binary snapshot of the in-memory store, kept next to the database.
+
+Loading the store from SQLite means fetching and decoding every row. A
+snapshot holds the same data as flat little-endian columns (finding ids,
+asset and title indexes, metric codes) plus string tables, so a warm start
+is a few bulk reads instead of a query per launch.
+
+A snapshot is only used while it matches db.data_generation(): any write
+to assets or findings through db.py, from this app or another process,
+makes it stale and the store falls back to SQL (and writes a fresh one).
+
+Layout: header, then sections, each an 8-byte length followed by the data
+padded to 8 bytes:
+
+    assets JSON [[id, name, tags, services], ...]
+    finding ids     string table
+    titles          string table
+    finding asset   uint32 index into assets
+    finding title   uint32 index into titles
+    finding code    uint16 CVSS metric code
+    by asset        uint32 finding indexes grouped by asset, in asset order
+    asset counts    uint32 findings per asset (group sizes for "by asset")
+    risk JSON       per-asset aggregates, see storage.Store._write_snapshot()
+
+A string table is a uint32 array of n + 1 character offsets followed by
+the UTF-8 text of all strings back to back.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+MAGIC = b"RMSNAP\x00\x00"
+SNAPSHOT_VERSION = 2  # 2: findings oldest first, as the store loads them
+# magic, version, db uid, generation, assets, findings, titles
+_HEADER = struct.Struct("<8sI32sQIII")
+_LENGTH = struct.Struct("<Q")
+
+AssetRow = Tuple[str, str, List[str], List[str]]
+
+@dataclass
+class Snapshot:
+    assets: List[AssetRow]
+    finding_ids: List[str]
+    finding_assets: List[int]
+    finding_titles: List[int]
+    titles: List[str]
+    codes: List[int]
+    by_asset: List[int]
+    asset_counts: List[int]
+    risk: List[Any]
+
+def snapshot_path(db_path: str) -> str:
+    return db_path + ".snapshot"
+
+def _little(a: array) -> array:
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a
+
+def _column(typecode: str, data: memoryview) -> List[int]:
+    a = array(typecode)
+    a.frombytes(data)
+    return _little(a).tolist()
+
+def _string_table(strings: Sequence[str]) -> bytes:
+    offsets = array("I", [0])
+    pos = 0
+    for s in strings:
+        pos += len(s)
+        offsets.append(pos)
+    return _little(offsets).tobytes() + "".join(strings).encode("utf-8")
+
+def _read_string_table(data: memoryview, n: int) -> List[str]:
+    size = 4 * (n + 1)
+    with data[:size] as head, data[size:] as body:
+        offsets = _column("I", head)
+        text = str(body, "utf-8")
+    return [text[a:b] for a, b in zip(offsets, offsets[1:])]
+
+def write_snapshot(
+    path: str,
+    uid: str,
+    generation: int,
+    assets: Sequence[AssetRow],
+    findings: Iterable[Tuple[str, int, str, int]],
+    risk: Sequence[Any],
+) -> None:
+    """Write (id, asset index, title, metric code) findings atomically.
+
+    `risk` is stored as JSON and handed back as is.
+    """
+    ids: List[str] = []
+    asset_idx = array("I")
+    title_idx = array("I")
+    codes = array("H")
+    title_ids = {}
+    for fid, ai, title, code in findings:
+        ti = title_ids.get(title)
+        if ti is None:
+            ti = title_ids[title] = len(title_ids)
+        ids.append(fid)
+        asset_idx.append(ai)
+        title_idx.append(ti)
+        codes.append(code)
+
+    # Stable sort: each asset's findings stay in store order.
+    by_asset = array("I", sorted(range(len(ids)), key=asset_idx.__getitem__))
+    asset_counts = array("I", bytes(4 * len(assets)))
+    for ai in asset_idx:
+        asset_counts[ai] += 1
+
+    sections = [
+        json.dumps([list(a) for a in assets]).encode("utf-8"),
+        _string_table(ids),
+        _string_table(list(title_ids)),
+        _little(asset_idx).tobytes(),
+        _little(title_idx).tobytes(),
+        _little(codes).tobytes(),
+        _little(by_asset).tobytes(),
+        _little(asset_counts).tobytes(),
+        json.dumps(risk).encode("utf-8"),
+    ]
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, SNAPSHOT_VERSION, uid.encode("ascii"), generation, len(assets), len(ids), len(title_ids)))
+        for data in sections:
+            f.write(_LENGTH.pack(len(data)))
+            f.write(data)
+            f.write(b"\x00" * (-len(data) % 8))
+    os.replace(tmp, path)
+
+def read_snapshot(path: str, uid: str, generation: int) -> Optional[Snapshot]:
+    """The snapshot at `path` if it belongs to this database generation.
+
+    Returns None when it is missing, stale, from another version or corrupt.
+    """
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                return _parse(view, uid, generation)
+            finally:
+                view.release()
+    except (OSError, ValueError, struct.error):
+        return None
+
+def _parse(view: memoryview, uid: str, generation: int) -> Optional[Snapshot]:
+    magic, version, snap_uid, snap_generation, n_assets, n_findings, n_titles = _HEADER.unpack_from(view)
+    if (magic, version, snap_uid, snap_generation) != (MAGIC, SNAPSHOT_VERSION, uid.encode("ascii"), generation):
+        return None
+
+    sections: List[memoryview] = []
+    try:
+        pos = _HEADER.size
+        for _ in range(9):
+            (size,) = _LENGTH.unpack_from(view, pos)
+            pos += _LENGTH.size
+            if pos + size > len(view):
+                raise ValueError("truncated snapshot")
+            sections.append(view[pos:pos + size])
+            pos += size + (-size % 8)
+
+        snap = Snapshot(
+            assets=[tuple(a) for a in json.loads(str(sections[0], "utf-8"))],
+            finding_ids=_read_string_table(sections[1], n_findings),
+            titles=_read_string_table(sections[2], n_titles),
+            finding_assets=_column("I", sections[3]),
+            finding_titles=_column("I", sections[4]),
+            codes=_column("H", sections[5]),
+            by_asset=_column("I", sections[6]),
+            asset_counts=_column("I", sections[7]),
+            risk=json.loads(str(sections[8], "utf-8")),
+        )
+    finally:
+        # The mmap can only be closed once no views into it are left.
+        for s in sections:
+            s.release()
+
+    counts = (
+        len(snap.assets), len(snap.finding_ids), len(snap.titles), len(snap.finding_assets),
+        len(snap.codes), len(snap.by_asset), len(snap.asset_counts), sum(snap.asset_counts),
+    )
+    if counts != (n_assets, n_findings, n_titles, n_findings, n_findings, n_findings, n_assets, n_findings):
+        raise ValueError("snapshot sections disagree on row counts")
+    for column, limit in ((snap.finding_assets, n_assets), (snap.finding_titles, n_titles), (snap.by_asset, n_findings)):
+        if max(column, default=-1) >= limit:
+            raise ValueError("snapshot index out of range")
+    return snap
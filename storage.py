@@ -1,8 +1,18 @@
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import functools
+import gc
+import os
+import sys
+import threading
+import time
 import uuid
 
+from cvss import code_for_key, decode_metrics, metrics_code, result_for_code, vector_for_code
 import db
+import snapshot
 
 @dataclass
 class Asset:
@@ -11,71 +21,416 @@ class Asset:
     tags: List[str] = field(default_factory=list)
     services: List[str] = field(default_factory=list)
 
-@dataclass
 class Finding:
-    id: str
-    asset_name: str
-    title: str
-    metrics: Dict[str, str]
-    score: float
-    severity: str
-    vector: str
+    """A scored finding, kept compact so large stores fit in memory.
+
+    The eight base metrics are packed into one CVSS metric code (see
+    cvss.metrics_code()) and metrics, score, severity and vector are derived
+    from it on access. Asset names and titles are interned, so findings of one
+    asset (or repeated titles) share a single string. `score`, `severity` and
+    `vector` are accepted for compatibility but always follow from the metrics.
+    """
+
+    __slots__ = ("id", "asset_name", "title", "code")
+
+    def __init__(
+        self,
+        id: str,
+        asset_name: str,
+        title: str,
+        metrics: Optional[Dict[str, str]] = None,
+        score: Optional[float] = None,
+        severity: Optional[str] = None,
+        vector: Optional[str] = None,
+        code: Optional[int] = None,
+    ) -> None:
+        self.id = id
+        self.asset_name = sys.intern(asset_name)
+        self.title = sys.intern(title)
+        self.code = metrics_code(metrics) if code is None else code
+
+    @property
+    def metrics(self) -> Dict[str, str]:
+        return decode_metrics(self.code)
+
+    @property
+    def score(self) -> float:
+        return result_for_code(self.code).score
+
+    @property
+    def severity(self) -> str:
+        return result_for_code(self.code).severity
+
+    @property
+    def vector(self) -> str:
+        return vector_for_code(self.code)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Finding):
+            return NotImplemented
+        return (self.id, self.asset_name, self.title, self.code) == (other.id, other.asset_name, other.title, other.code)
+
+    __hash__ = None  # mutable, like the dataclass it replaces
+
+    def __repr__(self) -> str:
+        return (
+            f"Finding(id={self.id!r}, asset_name={self.asset_name!r}, title={self.title!r}, "
+            f"score={self.score!r}, severity={self.severity!r}, vector={self.vector!r})"
+        )
+
+@dataclass
+class BulkResult:
+    inserted: int = 0
+    assets_created: int = 0
+    seconds: float = 0.0
+    updated: int = 0  # matched a stored finding by content key and changed it
+    unchanged: int = 0  # matched a stored finding (or an earlier row) as is
+    deleted: int = 0  # stored findings missing from a sync_findings() scan
+
+    @property
+    def rows_per_sec(self) -> float:
+        total = self.inserted + self.updated + self.unchanged
+        return total / self.seconds if self.seconds > 0 else 0.0
+
+SEVERITY_ORDER = ("Critical", "High", "Medium", "Low", "None")
+
+def _empty_counts() -> Dict[str, int]:
+    return {sev: 0 for sev in SEVERITY_ORDER}
+
+@dataclass(frozen=True)
+class RiskSummary:
+    count: int
+    max_score: float
+    avg_score: float
+    counts: Dict[str, int]
+
+class _RiskAggregate:
+    """Running count/sum/max and severity histogram for one asset.
+
+    Scores are tracked in integer tenths so adds and removes never drift, and
+    a score -> count map lets the max be recovered when the top finding goes.
+    """
+    __slots__ = ("count", "total10", "max10", "scores", "counts")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total10 = 0
+        self.max10 = 0
+        self.scores: Dict[int, int] = {}
+        self.counts = _empty_counts()
+
+    def add(self, score: float, severity: str) -> None:
+        s10 = round(score * 10)
+        self.count += 1
+        self.total10 += s10
+        self.scores[s10] = self.scores.get(s10, 0) + 1
+        if s10 > self.max10:
+            self.max10 = s10
+        self.counts[severity] = self.counts.get(severity, 0) + 1
+
+    def remove(self, score: float, severity: str) -> None:
+        s10 = round(score * 10)
+        self.count -= 1
+        self.total10 -= s10
+        left = self.scores[s10] - 1
+        if left:
+            self.scores[s10] = left
+        else:
+            del self.scores[s10]
+            if s10 == self.max10:
+                self.max10 = max(self.scores, default=0)
+        self.counts[severity] -= 1
+
+    def summary(self) -> RiskSummary:
+        return RiskSummary(
+            count=self.count,
+            max_score=self.max10 / 10.0,
+            avg_score=(self.total10 / self.count / 10.0) if self.count else 0.0,
+            counts=dict(self.counts),
+        )
+
+@dataclass
+class StoreChange:
+    """What a Store mutation changed, passed to subscribe()d listeners.
+
+    `touched_assets` holds the normalized names of assets whose findings (and
+    therefore risk aggregates) changed. `reload` means the whole store was
+    replaced and views should rebuild from scratch.
+    """
+    added_assets: List[str] = field(default_factory=list)
+    removed_assets: List[str] = field(default_factory=list)
+    added_findings: List[str] = field(default_factory=list)
+    removed_findings: List[str] = field(default_factory=list)
+    updated_findings: List[str] = field(default_factory=list)
+    touched_assets: Set[str] = field(default_factory=set)
+    reload: bool = False
+
+    def merge(self, other: "StoreChange") -> None:
+        """Fold a later change into this one (for batched UI updates)."""
+        self.added_assets.extend(other.added_assets)
+        self.removed_assets.extend(other.removed_assets)
+        self.added_findings.extend(other.added_findings)
+        self.removed_findings.extend(other.removed_findings)
+        self.updated_findings.extend(other.updated_findings)
+        self.touched_assets |= other.touched_assets
+        self.reload = self.reload or other.reload
+
+def _finding_from_row(row: Dict[str, Any]) -> Finding:
+    """Finding for a db.get_finding()/load_findings() dict."""
+    return Finding(
+        id=row["id"],
+        asset_name=row["asset_name"],
+        title=row["title"],
+        metrics=row["metrics"],
+        score=row["score"],
+        severity=row["severity"],
+        vector=row["vector"],
+    )
+
+def name_key(name: str) -> str:
+    """Asset name as the database compares it (see db.fold_name())."""
+    return db.fold_name(name)
+
+def _locked(method):
+    """Run a store method under the store's re-entrant lock.
+
+    Imports write from a background thread while the UI reads from its own.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class Store:
     def __init__(self) -> None:
         self.assets: Dict[str, Asset] = {}
         self.findings: Dict[str, Finding] = {}
+        # Indexes keyed by normalized asset name. Dicts are used as ordered
+        # sets so lookups keep the original insertion order.
+        self._asset_ids_by_name: Dict[str, Dict[str, None]] = {}
+        self._finding_ids_by_asset: Dict[str, Dict[str, None]] = {}
+        # Aggregates kept current on every add/delete (see check_aggregates()).
+        self._severity_counts = _empty_counts()
+        self._risk_by_asset: Dict[str, _RiskAggregate] = {}
+        self._listeners: List[Callable[[StoreChange], None]] = []
+        self._sorted_asset_ids: Dict[str, List[str]] = {}
+        self._lock = threading.RLock()
+
+    def subscribe(self, listener: Callable[[StoreChange], None]) -> None:
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[StoreChange], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _emit(self, change: StoreChange) -> None:
+        self._sorted_asset_ids.clear()
+        for listener in list(self._listeners):
+            listener(change)
 
     def _id(self) -> str:
         return uuid.uuid4().hex
 
+    def _index_asset(self, a: Asset) -> None:
+        self._asset_ids_by_name.setdefault(name_key(a.name), {})[a.id] = None
+
+    def _unindex_asset(self, a: Asset) -> None:
+        key = name_key(a.name)
+        ids = self._asset_ids_by_name.get(key)
+        if ids is not None:
+            ids.pop(a.id, None)
+            if not ids:
+                del self._asset_ids_by_name[key]
+
+    def _index_finding(self, f: Finding) -> None:
+        key = name_key(f.asset_name)
+        self._finding_ids_by_asset.setdefault(key, {})[f.id] = None
+        self._severity_counts[f.severity] = self._severity_counts.get(f.severity, 0) + 1
+        risk = self._risk_by_asset.get(key)
+        if risk is None:
+            risk = self._risk_by_asset[key] = _RiskAggregate()
+        risk.add(f.score, f.severity)
+
+    def _unindex_finding(self, f: Finding) -> None:
+        key = name_key(f.asset_name)
+        ids = self._finding_ids_by_asset.get(key)
+        if ids is not None:
+            ids.pop(f.id, None)
+            if not ids:
+                del self._finding_ids_by_asset[key]
+        self._severity_counts[f.severity] -= 1
+        risk = self._risk_by_asset[key]
+        risk.remove(f.score, f.severity)
+        if not risk.count:
+            del self._risk_by_asset[key]
+
+    @_locked
     def load_from_db(self) -> None:
+        """Load everything, from the snapshot file when it is current.
+
+        After a load from SQL a fresh snapshot is written for the next start.
+        """
         db.init_db()
         self.assets.clear()
         self.findings.clear()
+        self._asset_ids_by_name.clear()
+        self._finding_ids_by_asset.clear()
+        self._severity_counts = _empty_counts()
+        self._risk_by_asset.clear()
+
+        # Read before the rows: a write in between only makes the snapshot stale.
+        uid, generation = db.data_generation()
+        path = snapshot.snapshot_path(db.DB_PATH)
+
+        # Hundreds of thousands of new objects would otherwise trigger many
+        # full collections that cannot free anything.
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            snap = snapshot.read_snapshot(path, uid, generation)
+            if snap is not None:
+                self._load_snapshot(snap)
+            else:
+                self._load_rows()
+        finally:
+            if gc_was_enabled:
+                gc.enable()
 
+        self._emit(StoreChange(reload=True))
+        if snap is None:
+            self._write_snapshot(path, uid, generation)
+
+    def _load_rows(self) -> None:
         for a in db.load_assets():
             self.assets[a["id"]] = Asset(id=a["id"], name=a["name"], tags=a["tags"], services=a["services"])
 
-        for f in db.load_findings():
-            self.findings[f["id"]] = Finding(
-                id=f["id"],
-                asset_name=f["asset_name"],
-                title=f["title"],
-                metrics=f["metrics"],
-                score=f["score"],
-                severity=f["severity"],
-                vector=f["vector"],
-            )
+        for r in db.iter_finding_rows():
+            self.findings[r[0]] = Finding(id=r[0], asset_name=r[1], title=r[2], code=code_for_key(r[3:]))
 
-        existing_names = {a.name.strip().lower() for a in self.assets.values()}
+        for a in self.assets.values():
+            self._index_asset(a)
         for f in self.findings.values():
-            an = (f.asset_name or "").strip()
-            key = an.lower()
-            if an and key not in existing_names:
-                aid = self._id()
-                self.assets[aid] = Asset(id=aid, name=an, tags=[], services=[])
-                db.upsert_asset(aid, an, [], [])
-                existing_names.add(key)
+            self._index_finding(f)
+
+    def _load_snapshot(self, snap: snapshot.Snapshot) -> None:
+        names = []
+        for aid, name, tags, services in snap.assets:
+            a = self.assets[aid] = Asset(id=aid, name=name, tags=tags, services=services)
+            self._index_asset(a)
+            names.append(sys.intern(name))
+        titles = [sys.intern(t) for t in snap.titles]
+
+        # Finding.__init__ would re-intern and re-check every field.
+        findings = self.findings
+        new = object.__new__
+        for fid, ai, ti, code in zip(snap.finding_ids, snap.finding_assets, snap.finding_titles, snap.codes):
+            f = new(Finding)
+            f.id, f.asset_name, f.title, f.code = fid, names[ai], titles[ti], code
+            findings[fid] = f
+
+        ids = [snap.finding_ids[i] for i in snap.by_asset]
+        end = 0
+        for name, n in zip(names, snap.asset_counts):
+            if n:
+                start, end = end, end + n
+                self._finding_ids_by_asset[name_key(name)] = dict.fromkeys(ids[start:end])
+
+        for ai, count, total10, scores, counts in snap.risk:
+            risk = self._risk_by_asset[name_key(names[ai])] = _RiskAggregate()
+            risk.count, risk.total10, risk.counts = count, total10, counts
+            risk.scores = {s10: n for s10, n in scores}
+            risk.max10 = max(risk.scores, default=0)
+            for sev, n in counts.items():
+                self._severity_counts[sev] += n
+
+    def _write_snapshot(self, path: str, uid: str, generation: int) -> None:
+        assets = list(self.assets.values())
+        index = {name_key(a.name): i for i, a in enumerate(assets)}
+        # [asset index, count, total10, [[score10, n], ...], severity counts]
+        risk = [
+            [index[key], r.count, r.total10, list(r.scores.items()), r.counts]
+            for key, r in self._risk_by_asset.items()
+        ]
+        try:
+            snapshot.write_snapshot(
+                path, uid, generation,
+                [(a.id, a.name, a.tags, a.services) for a in assets],
+                ((f.id, index[name_key(f.asset_name)], f.title, f.code) for f in self.findings.values()),
+                risk,
+            )
+        except OSError:
+            pass  # read-only location: every start loads from SQL
 
+    @_locked
     def add_asset(self, name: str, tags: List[str], services: List[str]) -> Asset:
-        a = Asset(id=self._id(), name=name.strip(), tags=tags, services=services)
-        self.assets[a.id] = a
-        db.upsert_asset(a.id, a.name, a.tags, a.services)
+        """Create an asset, or update tags/services of the one with this name."""
+        a = self.get_asset_by_name(name)
+        if a is not None:
+            a.tags, a.services = tags, services
+            db.upsert_asset(a.id, a.name, a.tags, a.services)
+        else:
+            db.upsert_asset(self._id(), name.strip(), tags, services)
+            a = self._adopt_asset(db.get_asset_by_name(name))
+        self._emit(StoreChange(added_assets=[a.id], touched_assets={name_key(a.name)}))
         return a
 
+    def get_asset(self, asset_id: str) -> Optional[Asset]:
+        return self.assets.get(asset_id)
+
+    def asset_count(self) -> int:
+        return len(self.assets)
+
+    @_locked
+    def asset_names(self) -> List[str]:
+        return [a.name for a in self.assets.values()]
+
+    @_locked
     def get_asset_by_name(self, name: str) -> Optional[Asset]:
-        key = name.strip().lower()
-        for a in self.assets.values():
-            if a.name.strip().lower() == key:
-                return a
-        return None
+        ids = self._asset_ids_by_name.get(name_key(name))
+        if not ids:
+            return None
+        return self.assets[next(iter(ids))]
 
+    @_locked
     def delete_asset(self, asset_id: str) -> None:
+        """Delete an asset together with its findings (ON DELETE CASCADE)."""
         if asset_id in self.assets:
             db.delete_asset(asset_id)
-            del self.assets[asset_id]
+            a = self.assets.pop(asset_id)
+            self._unindex_asset(a)
+            removed = list(self._finding_ids_by_asset.get(name_key(a.name), {}))
+            for fid in removed:
+                self._unindex_finding(self.findings.pop(fid))
+            self._emit(StoreChange(
+                removed_assets=[asset_id],
+                removed_findings=removed,
+                touched_assets={name_key(a.name)},
+            ))
+
+    def _ensure_asset(self, name: str) -> Optional[Asset]:
+        """Create (and persist) a bare asset for `name` if the store has none.
+
+        Returns the asset (new, or stored by another process since this
+        store loaded), or None when the store already had it.
+        """
+        if name_key(name) in self._asset_ids_by_name:
+            return None
+        row = db.get_asset_by_name(name)
+        if row is None:
+            db.upsert_asset(self._id(), name, [], [])
+            row = db.get_asset_by_name(name)
+        return self._adopt_asset(row)
+
+    def _adopt_asset(self, row: Dict[str, Any]) -> Asset:
+        """Index a stored asset row. The row, not a freshly minted id, is
+        authoritative: another process may have created the name first."""
+        a = Asset(id=row["id"], name=row["name"], tags=row["tags"], services=row["services"])
+        self.assets[a.id] = a
+        self._index_asset(a)
+        return a
 
+    @_locked
     def add_finding(
         self,
         asset_name: str,
@@ -85,30 +440,572 @@ class Store:
         severity: str,
         vector: str,
     ) -> Finding:
+        asset_name = asset_name.strip() or "Unassigned"
+        asset = self._ensure_asset(asset_name)
         f = Finding(
             id=self._id(),
-            asset_name=asset_name.strip() or "Unassigned",
+            asset_name=self.get_asset_by_name(asset_name).name,
             title=title.strip() or "Untitled Finding",
             metrics=metrics,
             score=score,
             severity=severity,
             vector=vector,
         )
+        existing = db.finding_id_for_key(db.content_key(f.asset_name, f.title, f.metrics))
+        if existing is not None and existing in self.findings:
+            return self.findings[existing]
+        if existing is not None:
+            # Stored by another process since this store loaded: adopt it.
+            f = _finding_from_row(db.get_finding(existing))
+            f.asset_name = self.get_asset_by_name(f.asset_name).name
+        else:
+            db.insert_finding(f.id, f.asset_name, f.title, f.metrics, f.score, f.severity, f.vector)
         self.findings[f.id] = f
-        db.insert_finding(f.id, f.asset_name, f.title, f.metrics, f.score, f.severity, f.vector)
+        self._index_finding(f)
+        self._emit(StoreChange(
+            added_assets=[asset.id] if asset is not None else [],
+            added_findings=[f.id],
+            touched_assets={name_key(f.asset_name)},
+        ))
         return f
 
+    @_locked
+    def add_findings_bulk(
+        self,
+        items: Iterable[Dict[str, Any]],
+        commit_every: Optional[int] = None,
+    ) -> BulkResult:
+        """Insert many findings (add_finding() keyword dicts) at once.
+
+        Missing assets are created and everything is written on a single
+        connection with executemany; see db.insert_findings_bulk() for
+        `commit_every`.
+        """
+        return self._write_bulk(
+            items,
+            lambda assets, rows, on_commit: db.insert_findings_bulk(
+                assets, rows, commit_every=commit_every, on_commit=on_commit,
+            ),
+        )
+
+    @_locked
+    def sync_findings(
+        self,
+        items: Iterable[Dict[str, Any]],
+        scope: Optional[Iterable[str]] = None,
+    ) -> BulkResult:
+        """Like add_findings_bulk(), then delete the findings of the `scope`
+        assets that are not in `items`, in one transaction.
+
+        The scope defaults to the assets named in `items`; see
+        db.sync_findings().
+        """
+        return self._write_bulk(
+            items, lambda assets, rows, on_commit: db.sync_findings(assets, rows, scope, on_commit=on_commit),
+        )
+
+    def _write_bulk(
+        self,
+        items: Iterable[Dict[str, Any]],
+        write: Callable[
+            [List[Tuple[str, str]], Iterable[Tuple[Any, ...]], Callable[[db.UpsertResult], None]],
+            db.UpsertResult,
+        ],
+    ) -> BulkResult:
+        started = time.perf_counter()
+        names: Dict[str, str] = {}  # name_key -> canonical asset name
+        new_assets: List[Asset] = []
+        new_findings: List[Finding] = []
+
+        for item in items:
+            asset_name = (item.get("asset_name") or "").strip() or "Unassigned"
+            key = name_key(asset_name)
+            canonical = names.get(key)
+            if canonical is None:
+                existing = self.get_asset_by_name(asset_name)
+                if existing is None:
+                    new_assets.append(Asset(id=self._id(), name=asset_name, tags=[], services=[]))
+                    canonical = asset_name
+                else:
+                    canonical = existing.name
+                names[key] = canonical
+
+            new_findings.append(Finding(
+                id=self._id(),
+                asset_name=canonical,
+                title=(item.get("title") or "").strip() or "Untitled Finding",
+                metrics=item["metrics"],
+                code=item.get("code"),
+            ))
+
+        by_id = {f.id: f for f in new_findings}
+        added_assets: List[Asset] = []
+        added: List[Finding] = []
+        updated: List[Finding] = []
+        removed: List[Finding] = []
+        stored_names: Dict[str, str] = {}  # name as given -> name as stored
+
+        def apply(result: db.UpsertResult) -> None:
+            # Called after each commit, so memory never falls behind SQL.
+            # Assets are resolved on the first call: a name stored by another
+            # process keeps its stored id (and spelling).
+            for a in new_assets:
+                row = db.get_asset_by_name(a.name)
+                if row is not None and name_key(row["name"]) not in self._asset_ids_by_name:
+                    added_assets.append(self._adopt_asset(row))
+                    if row["name"] != a.name:
+                        stored_names[a.name] = row["name"]
+            new_assets.clear()
+            # Rows that matched a stored finding were not inserted.
+            for fid in result.inserted:
+                f = by_id.pop(fid)
+                if stored_names:
+                    f.asset_name = sys.intern(stored_names.get(f.asset_name, f.asset_name))
+                self.findings[fid] = f
+                self._index_finding(f)
+                added.append(f)
+            for fid, title in result.updated:
+                f = self.findings.get(fid)
+                if f is not None:
+                    f.title = sys.intern(title)
+                    updated.append(f)
+            for fid in result.deleted:
+                f = self.findings.pop(fid, None)
+                if f is not None:
+                    self._unindex_finding(f)
+                    removed.append(f)
+
+        try:
+            result = write(
+                [(a.id, a.name) for a in new_assets],
+                (
+                    db.finding_row(f.id, f.asset_name, f.title, f.metrics, f.score, f.severity, f.vector)
+                    for f in new_findings
+                ),
+                apply,
+            )
+        finally:
+            if added_assets or added or updated or removed:
+                self._emit(StoreChange(
+                    added_assets=[a.id for a in added_assets],
+                    added_findings=[f.id for f in added],
+                    removed_findings=[f.id for f in removed],
+                    updated_findings=[f.id for f in updated],
+                    touched_assets={name_key(f.asset_name) for f in added + updated + removed},
+                ))
+
+        return BulkResult(
+            inserted=len(added),
+            assets_created=len(added_assets),
+            seconds=time.perf_counter() - started,
+            updated=len(result.updated),
+            unchanged=result.unchanged,
+            deleted=len(result.deleted),
+        )
+
+    @_locked
     def delete_finding(self, finding_id: str) -> None:
         if finding_id in self.findings:
             db.delete_finding(finding_id)
-            del self.findings[finding_id]
+            f = self.findings.pop(finding_id)
+            self._unindex_finding(f)
+            self._emit(StoreChange(removed_findings=[finding_id], touched_assets={name_key(f.asset_name)}))
 
+    @_locked
     def findings_for_asset_name(self, asset_name: str) -> List[Finding]:
-        key = asset_name.strip().lower()
-        return [f for f in self.findings.values() if f.asset_name.strip().lower() == key]
+        ids = self._finding_ids_by_asset.get(name_key(asset_name), {})
+        return [self.findings[fid] for fid in ids]
+
+    @_locked
+    def _asset_order(self, sort: str) -> List[str]:
+        order = self._sorted_asset_ids.get(sort)
+        if order is None:
+            if sort == "recent":
+                order = list(reversed(self.assets))
+            elif sort == "name":
+                order = sorted(self.assets, key=lambda aid: name_key(self.assets[aid].name))
+            elif sort == "score":
+                def score_key(aid: str):
+                    key = name_key(self.assets[aid].name)
+                    risk = self._risk_by_asset.get(key)
+                    return (-(risk.max10 if risk else 0), -(risk.count if risk else 0), key)
+                order = sorted(self.assets, key=score_key)
+            else:
+                raise ValueError(f"Unknown asset sort: {sort}")
+            self._sorted_asset_ids[sort] = order
+        return order
+
+    def assets_page(self, offset: int, limit: int, sort: str = "recent") -> List[Asset]:
+        """One page of assets ordered by `sort` ("recent", "name" or "score").
+
+        The ordering is cached until the next store change.
+        """
+        return [self.assets[aid] for aid in self._asset_order(sort)[offset:offset + limit]]
 
+    @_locked
+    def _by_ids(self, ids: Iterable[str]) -> List[Finding]:
+        """Findings for ids from a database query, in order.
+
+        Rows another process wrote since the load are read from the database
+        (without adding them to the store), so pages match SQL counts.
+        """
+        found = []
+        for fid in ids:
+            f = self.findings.get(fid)
+            if f is None:
+                row = db.get_finding(fid)
+                if row is None:
+                    continue
+                f = _finding_from_row(row)
+            found.append(f)
+        return found
+
+    def findings_page(self, asset_name: str, offset: int, limit: int) -> List[Finding]:
+        """One page of an asset's findings, highest score first.
+
+        The page is read in order off the (asset, score) index instead of
+        sorting the asset's findings.
+        """
+        return self._by_ids(db.finding_ids_by_score(limit, offset, asset_name))
+
+    def top_findings(self, k: int) -> List[Finding]:
+        """The k highest-scoring findings, from the score index."""
+        return self._by_ids(db.finding_ids_by_score(k))
+
+    @_locked
+    def latest_findings(self, n: int) -> List[Finding]:
+        """The n newest findings; dict order is creation order (see db.load_findings())."""
+        return list(islice(reversed(self.findings.values()), n))
+
+    def search_findings(self, query: str, offset: int = 0, limit: int = 50) -> Tuple[int, List[Finding]]:
+        """(total matches, one page of them) for a full-text search; see db.search_findings()."""
+        total, rows = db.search_findings(query, offset, limit)
+        return total, self._by_ids(r["id"] for r in rows)
+
+    def iter_findings(self, asset_names: Optional[List[str]] = None) -> Iterator[Finding]:
+        # Snapshot under the lock so a concurrent import can't change the
+        # dicts mid-iteration.
+        with self._lock:
+            if asset_names is None:
+                found = list(self.findings.values())
+            else:
+                found = [
+                    self.findings[fid]
+                    for key in dict.fromkeys(name_key(n) for n in asset_names)
+                    for fid in self._finding_ids_by_asset.get(key, {})
+                ]
+        yield from found
+
+    @_locked
     def severity_counts(self) -> Dict[str, int]:
-        counts = {"Critical": 0, "High": 0, "Medium": 0, "Low": 0, "None": 0}
+        return dict(self._severity_counts)
+
+    @_locked
+    def asset_risk(self, asset_name: str) -> RiskSummary:
+        risk = self._risk_by_asset.get(name_key(asset_name))
+        return (risk or _RiskAggregate()).summary()
+
+    @_locked
+    def check_aggregates(self) -> None:
+        """Recompute indexes and aggregates from scratch and compare.
+
+        Raises RuntimeError describing the first inconsistency found.
+        """
+        counts = _empty_counts()
+        by_asset: Dict[str, _RiskAggregate] = {}
+        ids_by_asset: Dict[str, Dict[str, None]] = {}
         for f in self.findings.values():
+            key = name_key(f.asset_name)
             counts[f.severity] = counts.get(f.severity, 0) + 1
+            by_asset.setdefault(key, _RiskAggregate()).add(f.score, f.severity)
+            ids_by_asset.setdefault(key, {})[f.id] = None
+
+        if counts != self._severity_counts:
+            raise RuntimeError(f"Severity counts out of sync: {self._severity_counts} != {counts}")
+        if set(by_asset) != set(self._risk_by_asset):
+            raise RuntimeError("Per-asset aggregates cover a different set of assets")
+        for key, expected in by_asset.items():
+            if self._risk_by_asset[key].summary() != expected.summary():
+                raise RuntimeError(f"Aggregate out of sync for asset '{key}'")
+        if {k: set(v) for k, v in ids_by_asset.items()} != {k: set(v) for k, v in self._finding_ids_by_asset.items()}:
+            raise RuntimeError("Finding index out of sync")
+
+        names: Dict[str, set] = {}
+        for a in self.assets.values():
+            names.setdefault(name_key(a.name), set()).add(a.id)
+        if names != {k: set(v) for k, v in self._asset_ids_by_name.items()}:
+            raise RuntimeError("Asset name index out of sync")
+
+class SqlStore:
+    """Store that answers queries straight from SQLite.
+
+    Nothing is loaded up front: lookups, pages and counts are indexed queries,
+    and hydrated Finding/Asset objects are kept in bounded LRU caches. It
+    exposes the same query/mutation API and change events as Store, minus the
+    `assets`/`findings` dicts.
+    """
+
+    def __init__(self, cache_size: int = 10_000) -> None:
+        self.cache_size = cache_size
+        self._findings: "OrderedDict[str, Finding]" = OrderedDict()
+        self._assets: "OrderedDict[str, Asset]" = OrderedDict()
+        self._listeners: List[Callable[[StoreChange], None]] = []
+        self._lock = threading.RLock()
+
+    def subscribe(self, listener: Callable[[StoreChange], None]) -> None:
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[StoreChange], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _emit(self, change: StoreChange) -> None:
+        for listener in list(self._listeners):
+            listener(change)
+
+    def _id(self) -> str:
+        return uuid.uuid4().hex
+
+    @_locked
+    def _cache_put(self, cache: "OrderedDict[str, Any]", key: str, value: Any) -> Any:
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return value
+
+    @_locked
+    def _asset(self, row: Optional[Dict[str, Any]]) -> Optional[Asset]:
+        if row is None:
+            return None
+        cached = self._assets.get(row["id"])
+        if cached is not None:
+            self._assets.move_to_end(row["id"])
+            return cached
+        a = Asset(id=row["id"], name=row["name"], tags=row["tags"], services=row["services"])
+        return self._cache_put(self._assets, a.id, a)
+
+    @_locked
+    def _finding(self, row: Dict[str, Any]) -> Finding:
+        cached = self._findings.get(row["id"])
+        if cached is not None:
+            self._findings.move_to_end(row["id"])
+            return cached
+        f = _finding_from_row(row)
+        return self._cache_put(self._findings, f.id, f)
+
+    def load_from_db(self) -> None:
+        db.init_db()
+        self._findings.clear()
+        self._assets.clear()
+        self._emit(StoreChange(reload=True))
+
+    @_locked
+    def get_asset(self, asset_id: str) -> Optional[Asset]:
+        cached = self._assets.get(asset_id)
+        return cached if cached is not None else self._asset(db.get_asset(asset_id))
+
+    def asset_count(self) -> int:
+        return db.count_assets()
+
+    def asset_names(self) -> List[str]:
+        return db.asset_names()
+
+    def get_asset_by_name(self, name: str) -> Optional[Asset]:
+        return self._asset(db.get_asset_by_name(name))
+
+    @_locked
+    def add_asset(self, name: str, tags: List[str], services: List[str]) -> Asset:
+        """Create an asset, or update tags/services of the one with this name."""
+        db.upsert_asset(self._id(), name.strip(), tags, services)
+        row = db.get_asset_by_name(name)
+        self._assets.pop(row["id"], None)
+        a = self._asset(row)
+        self._emit(StoreChange(added_assets=[a.id], touched_assets={name_key(a.name)}))
+        return a
+
+    @_locked
+    def delete_asset(self, asset_id: str) -> None:
+        """Delete an asset together with its findings (ON DELETE CASCADE)."""
+        a = self.get_asset(asset_id)
+        if a is not None:
+            removed = db.finding_ids_for_asset(a.name)
+            db.delete_asset(asset_id)
+            self._assets.pop(asset_id, None)
+            for fid in removed:
+                self._findings.pop(fid, None)
+            self._emit(StoreChange(
+                removed_assets=[asset_id],
+                removed_findings=removed,
+                touched_assets={name_key(a.name)},
+            ))
+
+    def add_finding(
+        self,
+        asset_name: str,
+        title: str,
+        metrics: Dict[str, str],
+        score: float,
+        severity: str,
+        vector: str,
+    ) -> Finding:
+        asset_name = asset_name.strip() or "Unassigned"
+        asset = self.get_asset_by_name(asset_name)
+        created = asset is None
+        if created:
+            db.upsert_asset(self._id(), asset_name, [], [])
+            asset = self.get_asset_by_name(asset_name)
+        f = Finding(
+            id=self._id(),
+            asset_name=asset.name,
+            title=title.strip() or "Untitled Finding",
+            metrics=metrics,
+            score=score,
+            severity=severity,
+            vector=vector,
+        )
+        existing = db.finding_id_for_key(db.content_key(f.asset_name, f.title, f.metrics))
+        if existing is not None:
+            return self._finding(db.get_finding(existing))
+        db.insert_finding(f.id, f.asset_name, f.title, f.metrics, f.score, f.severity, f.vector)
+        self._cache_put(self._findings, f.id, f)
+        self._emit(StoreChange(
+            added_assets=[asset.id] if created else [],
+            added_findings=[f.id],
+            touched_assets={name_key(f.asset_name)},
+        ))
+        return f
+
+    def add_findings_bulk(
+        self,
+        items: Iterable[Dict[str, Any]],
+        commit_every: Optional[int] = None,
+    ) -> BulkResult:
+        """Same contract as Store.add_findings_bulk(); rows are not cached."""
+        return self._write_bulk(
+            items, lambda assets, rows: db.insert_findings_bulk(assets, rows, commit_every=commit_every),
+        )
+
+    def sync_findings(
+        self,
+        items: Iterable[Dict[str, Any]],
+        scope: Optional[Iterable[str]] = None,
+    ) -> BulkResult:
+        """Same contract as Store.sync_findings()."""
+        scope = None if scope is None else list(scope)
+        return self._write_bulk(
+            items, lambda assets, rows: db.sync_findings(assets, rows, scope),
+            touched={name_key(n) for n in scope or ()},
+        )
+
+    def _write_bulk(
+        self,
+        items: Iterable[Dict[str, Any]],
+        write: Callable[[List[Tuple[str, str]], Iterable[Tuple[Any, ...]]], db.UpsertResult],
+        touched: Optional[Set[str]] = None,
+    ) -> BulkResult:
+        started = time.perf_counter()
+        checked: Set[str] = set()
+        new_assets: List[Asset] = []
+        rows: List[tuple] = []
+        touched = touched or set()
+
+        for item in items:
+            asset_name = (item.get("asset_name") or "").strip() or "Unassigned"
+            key = name_key(asset_name)
+            if key not in checked:
+                checked.add(key)
+                if db.get_asset_by_name(asset_name) is None:
+                    new_assets.append(Asset(id=self._id(), name=asset_name, tags=[], services=[]))
+
+            title = (item.get("title") or "").strip() or "Untitled Finding"
+            rows.append(db.finding_row(
+                self._id(), asset_name, title,
+                item["metrics"], item["score"], item["severity"], item["vector"],
+            ))
+            touched.add(key)
+
+        result = write([(a.id, a.name) for a in new_assets], rows)
+        with self._lock:
+            for fid, _ in result.updated:
+                self._findings.pop(fid, None)
+            for fid in result.deleted:
+                self._findings.pop(fid, None)
+        if result.inserted or result.updated or result.deleted:
+            self._emit(StoreChange(
+                added_assets=[a.id for a in new_assets],
+                added_findings=result.inserted,
+                removed_findings=result.deleted,
+                updated_findings=[fid for fid, _ in result.updated],
+                touched_assets=touched,
+            ))
+        return BulkResult(
+            inserted=len(result.inserted),
+            assets_created=len(new_assets),
+            seconds=time.perf_counter() - started,
+            updated=len(result.updated),
+            unchanged=result.unchanged,
+            deleted=len(result.deleted),
+        )
+
+    @_locked
+    def delete_finding(self, finding_id: str) -> None:
+        row = db.get_finding(finding_id)
+        if row is not None:
+            db.delete_finding(finding_id)
+            self._findings.pop(finding_id, None)
+            self._emit(StoreChange(removed_findings=[finding_id], touched_assets={name_key(row["asset_name"])}))
+
+    def findings_for_asset_name(self, asset_name: str) -> List[Finding]:
+        return [self._finding(r) for r in db.findings_for_asset(asset_name)]
+
+    def assets_page(self, offset: int, limit: int, sort: str = "recent") -> List[Asset]:
+        return [self._asset(r) for r in db.assets_page(offset, limit, sort)]
+
+    def findings_page(self, asset_name: str, offset: int, limit: int) -> List[Finding]:
+        return [self._finding(r) for r in db.findings_for_asset(asset_name, offset, limit)]
+
+    def latest_findings(self, n: int) -> List[Finding]:
+        return [self._finding(r) for r in db.latest_findings(n)]
+
+    def top_findings(self, k: int) -> List[Finding]:
+        return [self._finding(r) for r in db.top_findings(k)]
+
+    def search_findings(self, query: str, offset: int = 0, limit: int = 50) -> Tuple[int, List[Finding]]:
+        total, rows = db.search_findings(query, offset, limit)
+        return total, [self._finding(r) for r in rows]
+
+    def iter_findings(self, asset_names: Optional[List[str]] = None) -> Iterator[Finding]:
+        # Streamed without touching the cache, so exports don't evict hot rows.
+        for r in db.iter_findings(asset_names):
+            yield _finding_from_row(r)
+
+    def severity_counts(self) -> Dict[str, int]:
+        counts = _empty_counts()
+        counts.update(db.severity_counts())
         return counts
+
+    def asset_risk(self, asset_name: str) -> RiskSummary:
+        return RiskSummary(**db.asset_risk(asset_name))
+
+STORE_MODE_ENV = "RISKMAPPER_STORE"
+# In "auto" mode databases larger than this are served lazily from SQL.
+LAZY_STORE_BYTES = 32 * 1024 * 1024
+
+def open_store(mode: Optional[str] = None):
+    """Create the store the app should use: "memory", "sql" or "auto".
+
+    The mode defaults to $RISKMAPPER_STORE, then "auto".
+    """
+    mode = (mode or os.environ.get(STORE_MODE_ENV) or "auto").lower()
+    if mode == "auto":
+        try:
+            big = os.path.getsize(db.DB_PATH) > LAZY_STORE_BYTES
+        except OSError:
+            big = False
+        mode = "sql" if big else "memory"
+    if mode == "sql":
+        return SqlStore()
+    if mode == "memory":
+        return Store()
+    raise ValueError(f"Unknown store mode: {mode}")
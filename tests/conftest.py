@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db  # noqa: E402
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """A fresh database file as db.DB_PATH; connections closed afterwards."""
+    path = str(tmp_path / "test.db")
+    monkeypatch.setattr(db, "DB_PATH", path)
+    yield path
+    db.close_all()
+    db._initialized.discard(path)
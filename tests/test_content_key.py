@@ -0,0 +1,66 @@
+import sqlite3
+
+import pytest
+
+import db
+import importer
+from storage import SqlStore, Store
+
+HEADER = "asset,title,AV,AC,PR,UI,S,C,I,A\n"
+
+@pytest.mark.parametrize("store_cls", [Store, SqlStore])
+def test_asset_names_fold_like_nocase(db_path, store_cls):
+    db.init_db()
+    store = store_cls()
+    store.load_from_db()
+
+    assert importer.import_text(store, HEADER + "Ärger,XSS,N,L,N,N,U,H,H,H\n").imported == 1
+    # Only ASCII letters fold: "ärger" is another asset with its own finding.
+    assert importer.import_text(store, HEADER + "ärger,XSS,N,L,N,N,U,H,H,H\n").imported == 1
+    assert importer.import_text(store, HEADER + "ÄRGER,XSS,N,L,N,N,U,H,H,H\n").unchanged == 1
+    assert {r["asset"]: r["count"] for r in db.risk_by_asset()} == {"Ärger": 1, "ärger": 1}
+
+def test_migration_rekeys_version_2_findings(db_path):
+    db.init_db()
+    store = SqlStore()
+    importer.import_text(store, HEADER + "Ärger,XSS,N,L,N,N,U,H,H,H\n")
+    db.close_all()
+    db._initialized.discard(db_path)
+
+    # Key as version 2 computed it: the asset name fully lower-cased.
+    con = sqlite3.connect(db_path)
+    old = db._content_key("ärger", "XSS", ["N", "L", "N", "N", "U", "H", "H", "H"])
+    con.execute("UPDATE findings SET content_key = ?", (old,))
+    con.execute("PRAGMA user_version=2")
+    con.commit()
+    con.close()
+
+    db.init_db()
+    assert importer.import_text(SqlStore(), HEADER + "Ärger,XSS,N,L,N,N,U,H,H,H\n").unchanged == 1
+
+def test_add_finding_adopts_row_written_by_another_process(db_path):
+    db.init_db()
+    store = Store()
+    store.load_from_db()
+    # Another process (e.g. a CLI import) writes after the store loaded.
+    importer.import_text(SqlStore(), HEADER + "web-01,XSS,N,L,N,N,U,H,H,H\n")
+    metrics = {"AV": "N", "AC": "L", "PR": "N", "UI": "N", "S": "U", "C": "H", "I": "H", "A": "H"}
+    f = store.add_finding("WEB-01", "xss", metrics, 9.8, "Critical", "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H")
+
+    assert f.id == db.load_findings()[0]["id"]
+    assert store.findings[f.id] is f
+    assert len(db.load_findings()) == 1
+    store.check_aggregates()
+
+@pytest.mark.parametrize("store_cls", [Store, SqlStore])
+def test_add_finding_matches_on_canonical_metrics(db_path, store_cls):
+    db.init_db()
+    store = store_cls()
+    store.load_from_db()
+    metrics = {"AV": "N ", "AC": "l", "PR": "N", "UI": "N", "S": "U", "C": "H", "I": "H", "A": "H"}
+    vector = "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H"
+    first = store.add_finding("web", "t", metrics, 9.8, "Critical", vector)
+    again = store.add_finding("web", "t", metrics, 9.8, "Critical", vector)
+
+    assert again.id == first.id
+    assert len(db.load_findings()) == 1
@@ -0,0 +1,32 @@
+import pytest
+
+import cvss
+
+# Base scores from the CVSS v3.1 specification examples and NVD.
+KNOWN = [
+    ("CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H", 9.8, "Critical"),
+    ("CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:C/C:H/I:H/A:H", 10.0, "Critical"),
+    ("CVSS:3.1/AV:N/AC:L/PR:N/UI:R/S:C/C:L/I:L/A:N", 6.1, "Medium"),
+    ("CVSS:3.1/AV:L/AC:L/PR:L/UI:N/S:U/C:H/I:N/A:N", 5.5, "Medium"),
+    ("CVSS:3.1/AV:N/AC:H/PR:N/UI:N/S:U/C:L/I:N/A:N", 3.7, "Low"),
+    ("CVSS:3.1/AV:P/AC:H/PR:H/UI:R/S:U/C:N/I:N/A:N", 0.0, "None"),
+]
+
+def test_table_matches_reference_formula():
+    assert cvss.check_table() == cvss.VECTOR_COUNT == 2592
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_batch_scores_known_vectors(use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    metrics = [cvss.metrics_from_vector(v) for v, _, _ in KNOWN]
+    rows = {k: [m[k] for m in metrics] + ["X"] for k in cvss.METRIC_FIELDS}
+    scores = cvss.calculate_base_scores(rows, use_numpy=use_numpy)
+
+    assert list(scores.score[:-1]) == [score for _, score, _ in KNOWN]
+    assert list(scores.severity[:-1]) == [sev for _, _, sev in KNOWN]
+    assert [cvss.vector_for_code(c) for c in scores.codes[:-1]] == [v for v, _, _ in KNOWN]
+    assert [idx for idx, _ in scores.invalid] == [len(KNOWN)]
+    for v, score, sev in KNOWN:
+        r = cvss.reference_base_score(cvss.metrics_from_vector(v))
+        assert (r.score, r.severity) == (score, sev)
@@ -0,0 +1,34 @@
+import threading
+
+import db
+
+ROW_METRICS = {"AV": "N", "AC": "L", "PR": "N", "UI": "N", "S": "U", "C": "H", "I": "H", "A": "H"}
+
+def test_close_all_leaves_other_threads_connections_usable(db_path):
+    db.init_db()
+    rows = [
+        db.finding_row(f"f{i}", "web-01", f"Finding {i}", ROW_METRICS, 9.8, "Critical", "")
+        for i in range(4)
+    ]
+    committed, resume = threading.Event(), threading.Event()
+    errors = []
+
+    def on_commit(result):
+        committed.set()
+        resume.wait(5)
+
+    def run_import():
+        try:
+            db.insert_findings_bulk([("a1", "web-01")], rows, commit_every=2, on_commit=on_commit)
+        except Exception as e:
+            errors.append(e)
+
+    t = threading.Thread(target=run_import)
+    t.start()
+    assert committed.wait(5)
+    db.close_all()  # e.g. the page disconnects between two chunk commits
+    resume.set()
+    t.join(5)
+
+    assert errors == []
+    assert len(db.load_findings()) == 4
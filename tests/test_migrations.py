@@ -0,0 +1,126 @@
+import sqlite3
+
+import pytest
+
+import db
+
+LEGACY_SCHEMA = """
+CREATE TABLE assets (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    tags TEXT NOT NULL,
+    services TEXT NOT NULL,
+    created_at TEXT DEFAULT (datetime('now'))
+);
+CREATE TABLE findings (
+    id TEXT PRIMARY KEY,
+    asset_name TEXT NOT NULL,
+    title TEXT NOT NULL,
+    av TEXT NOT NULL, ac TEXT NOT NULL, pr TEXT NOT NULL, ui TEXT NOT NULL,
+    s TEXT NOT NULL, c TEXT NOT NULL, i TEXT NOT NULL, a TEXT NOT NULL,
+    score REAL NOT NULL,
+    severity TEXT NOT NULL,
+    vector TEXT NOT NULL,
+    created_at TEXT DEFAULT (datetime('now'))
+);
+CREATE INDEX idx_findings_asset ON findings(asset_name);
+INSERT INTO assets(id, name, tags, services) VALUES ('a1', 'web-01', '', '');
+INSERT INTO findings(id, asset_name, title, av, ac, pr, ui, s, c, i, a, score, severity, vector) VALUES
+    ('f1', 'web-01', 'XSS', 'N', 'L', 'N', 'R', 'C', 'L', 'L', 'N', 6.1, 'Medium', 'CVSS:3.1/AV:N/AC:L/PR:N/UI:R/S:C/C:L/I:L/A:N'),
+    ('f2', 'db-02', 'Weak TLS', 'N', 'H', 'N', 'N', 'U', 'L', 'N', 'N', 3.7, 'Low', 'CVSS:3.1/AV:N/AC:H/PR:N/UI:N/S:U/C:L/I:N/A:N');
+"""
+
+def make_legacy(path):
+    con = sqlite3.connect(path)
+    con.executescript(LEGACY_SCHEMA)
+    con.close()
+
+def schema_state(path):
+    con = sqlite3.connect(path)
+    try:
+        version = con.execute("PRAGMA user_version").fetchone()[0]
+        tables = {r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        return version, tables
+    finally:
+        con.close()
+
+def boom(*args, **kwargs):
+    raise RuntimeError("injected failure")
+
+def test_failed_migration_rolls_back_and_retry_succeeds(db_path, monkeypatch):
+    make_legacy(db_path)
+    monkeypatch.setattr(db, "_create_tables", boom)
+    with pytest.raises(RuntimeError, match="injected"):
+        db.init_db()
+    db.close_all()
+
+    # Nothing of the half-done migration is left behind.
+    version, tables = schema_state(db_path)
+    assert version == 0
+    assert tables == {"assets", "findings"}
+
+    monkeypatch.undo()
+    monkeypatch.setattr(db, "DB_PATH", db_path)
+    db.init_db(force=True)
+    version, tables = schema_state(db_path)
+    assert version == db.SCHEMA_VERSION
+    assert not {"assets_v0", "findings_v0"} & tables
+    assert sorted(f["id"] for f in db.load_findings()) == ["f1", "f2"]
+    assert sorted(a["name"] for a in db.load_assets()) == ["db-02", "web-01"]
+
+def test_failure_after_last_migration_keeps_old_version(db_path, monkeypatch):
+    make_legacy(db_path)
+    monkeypatch.setattr(db, "_create_generation", boom)
+    with pytest.raises(RuntimeError, match="injected"):
+        db.init_db()
+    db.close_all()
+    assert schema_state(db_path) == (0, {"assets", "findings"})
+
+def make_v1_with_duplicates(path, monkeypatch):
+    """Version 1 database holding the same finding three times."""
+    make_legacy(path)
+    con = sqlite3.connect(path)
+    con.execute("""
+    INSERT INTO findings(id, asset_name, title, av, ac, pr, ui, s, c, i, a, score, severity, vector)
+    SELECT id || suffix, UPPER(asset_name), title || pad, av, ac, pr, ui, s, c, i, a, score, severity, vector
+    FROM findings, (SELECT 'b' AS suffix, ' ' AS pad UNION ALL SELECT 'c', '') WHERE id = 'f1'
+    """)
+    con.commit()
+    con.close()
+    with monkeypatch.context() as m:
+        m.setattr(db, "SCHEMA_VERSION", 1)
+        db.init_db()
+    db.close_all()
+    db._initialized.discard(path)
+
+def test_content_key_migration_collapses_duplicates(db_path, monkeypatch):
+    make_v1_with_duplicates(db_path, monkeypatch)
+    assert schema_state(db_path)[0] == 1
+
+    db.init_db()
+    assert schema_state(db_path)[0] == db.SCHEMA_VERSION
+    # The oldest copy wins.
+    assert sorted(f["id"] for f in db.load_findings()) == ["f1", "f2"]
+    assert db.severity_counts()["Medium"] == 1
+
+def test_failed_content_key_migration_can_be_retried(db_path, monkeypatch):
+    make_v1_with_duplicates(db_path, monkeypatch)
+    migrate = db.MIGRATIONS[1]
+
+    def fail_after(cur):
+        migrate(cur)
+        raise sqlite3.IntegrityError("injected failure")
+
+    monkeypatch.setitem(db.MIGRATIONS, 1, fail_after)
+    with pytest.raises(sqlite3.IntegrityError, match="injected"):
+        db.init_db()
+    db.close_all()
+    con = sqlite3.connect(db_path)
+    columns = [r[1] for r in con.execute("PRAGMA table_info(findings)")]
+    con.close()
+    assert "content_key" not in columns
+
+    monkeypatch.setitem(db.MIGRATIONS, 1, migrate)
+    db.init_db(force=True)
+    assert schema_state(db_path)[0] == db.SCHEMA_VERSION
+    assert sorted(f["id"] for f in db.load_findings()) == ["f1", "f2"]
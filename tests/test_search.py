@@ -0,0 +1,28 @@
+import db
+import importer
+from storage import SqlStore, Store
+
+HEADER = "asset,title,AV,AC,PR,UI,S,C,I,A\n"
+
+def test_search_pages_include_rows_written_by_another_process(db_path):
+    db.init_db()
+    store = Store()
+    store.load_from_db()
+    importer.import_text(store, HEADER + "web-01,SQL injection in login,N,L,N,N,U,H,H,H\n")
+    # Another process imports after the store loaded.
+    importer.import_text(SqlStore(), HEADER + "web-02,SQL injection in search,N,L,N,N,U,L,L,N\n")
+
+    total, page = store.search_findings("injection")
+    assert total == 2
+    assert sorted(f.asset_name for f in page) == ["web-01", "web-02"]
+    # Read for the page only, not adopted into the store.
+    assert len(store.findings) == 1
+
+def test_search_matches_title_and_asset_words(db_path):
+    db.init_db()
+    store = SqlStore()
+    importer.import_text(store, HEADER + "web-01,XSS in search,N,L,N,R,C,L,L,N\ndb-02,Weak TLS,N,H,N,N,U,L,N,N\n")
+
+    assert [f.title for f in store.search_findings("web-01 xss")[1]] == ["XSS in search"]
+    assert store.search_findings("tl")[0] == 1
+    assert store.search_findings('"')[0] == 0
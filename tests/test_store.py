@@ -0,0 +1,80 @@
+import pytest
+
+import db
+import importer
+from storage import SqlStore, Store
+
+HEADER = "asset,title,AV,AC,PR,UI,S,C,I,A\n"
+
+def test_assets_created_elsewhere_keep_their_stored_id(db_path):
+    db.init_db()
+    store = Store()
+    store.load_from_db()
+    # Another process creates both assets after the store loaded.
+    other = SqlStore()
+    cli = other.add_asset("Web-01", ["dmz"], [])
+    importer.import_text(other, HEADER + "DB-01,Weak TLS,N,H,N,N,U,L,N,N\n")
+
+    a = store.add_asset("web-01", ["prod"], ["https"])
+    assert (a.id, a.name) == (cli.id, "Web-01")
+    assert db.get_asset(a.id)["tags"] == ["prod"]
+
+    metrics = {"AV": "N", "AC": "L", "PR": "N", "UI": "R", "S": "C", "C": "L", "I": "L", "A": "N"}
+    f = store.add_finding("db-01", "XSS", metrics, 6.1, "Medium", "CVSS:3.1/AV:N/AC:L/PR:N/UI:R/S:C/C:L/I:L/A:N")
+    b = store.get_asset_by_name("db-01")
+    assert b.id == db.get_asset_by_name("db-01")["id"]
+    assert f.asset_name == b.name == "DB-01"
+
+    store.delete_asset(b.id)
+    assert db.get_asset_by_name("db-01") is None
+    assert db.load_findings() == []
+    store.check_aggregates()
+
+def _rows(n):
+    metrics = {"AV": "N", "AC": "L", "PR": "N", "UI": "N", "S": "U", "C": "H", "I": "H", "A": "H"}
+    return [
+        {"asset_name": "web-01", "title": f"Finding {i}", "metrics": metrics,
+         "score": 9.8, "severity": "Critical", "vector": "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H"}
+        for i in range(n)
+    ]
+
+def test_bulk_write_failure_keeps_committed_chunks_in_memory(db_path, monkeypatch):
+    db.init_db()
+    store = Store()
+    store.load_from_db()
+    # Another process creates the asset under its own id.
+    stored = SqlStore().add_asset("WEB-01", [], [])
+    changes = []
+    store.subscribe(changes.append)
+
+    upsert_chunk = db._upsert_chunk
+    calls = []
+    def failing_chunk(cur, rows):
+        calls.append(rows)
+        if len(calls) == 2:
+            raise RuntimeError("disk full")
+        return upsert_chunk(cur, rows)
+    monkeypatch.setattr(db, "_upsert_chunk", failing_chunk)
+
+    with pytest.raises(RuntimeError):
+        store.add_findings_bulk(_rows(5), commit_every=2)
+
+    assert sorted(store.findings) == sorted(f["id"] for f in db.load_findings())
+    assert len(store.findings) == 2
+    assert [a.id for a in store.assets.values()] == [stored.id]
+    assert {f.asset_name for f in store.findings.values()} == {"WEB-01"}
+    assert changes[0].added_findings == list(store.findings)
+    store.check_aggregates()
+
+def test_generation_bumps_once_per_write_transaction(db_path):
+    db.init_db()
+    store = SqlStore()
+    uid, before = db.data_generation()
+
+    store.add_findings_bulk(_rows(5), commit_every=2)
+    assert db.data_generation() == (uid, before + 3)
+    # Nothing stored changes, so caches stay valid.
+    store.add_findings_bulk(_rows(5))
+    assert db.data_generation() == (uid, before + 3)
+    store.delete_finding(db.load_findings()[0]["id"])
+    assert db.data_generation() == (uid, before + 4)
@@ -60,3 +60,14 @@ def toast_bar(msg: str, kind: str = "info") -> ft.SnackBar:
         bgcolor=ft.colors.with_opacity(0.15, color),
         show_close_icon=True,
     )
+
+def pager(label: ft.Text, on_prev, on_next) -> ft.Row:
+    """Previous / label / next controls for paged lists."""
+    return ft.Row(
+        [
+            ft.IconButton(icon=ft.icons.CHEVRON_LEFT, tooltip="Previous page", on_click=on_prev),
+            label,
+            ft.IconButton(icon=ft.icons.CHEVRON_RIGHT, tooltip="Next page", on_click=on_next),
+        ],
+        alignment=ft.MainAxisAlignment.CENTER,
+    )